@@ -0,0 +1,117 @@
+"""
+Generate synthetic datasets for the benchmarks.
+
+Files are written once to $READER_ADAPTER_BENCHMARK_DATA (by default, a
+directory under the system's temporary directory) and reused by later runs.
+Run as a script to generate them all ahead of time:
+
+    python benchmarks/data.py
+"""
+import os
+import sys
+import tempfile
+
+DATA_DIR = os.environ.get(
+    'READER_ADAPTER_BENCHMARK_DATA',
+    os.path.join(tempfile.gettempdir(), 'reader_adapter_benchmarks'))
+
+# Parameters shared by the benchmarks and main().
+TIFF_NFILES = [100, 1000]  # number of small files
+TIFF_SMALL_SHAPE = (64, 64)
+TIFF_NPAGES = [100, 2000]  # pages in one stack
+TIFF_PAGE_SHAPE = (512, 512)
+FWF_NBYTES = [10 ** 6, 10 ** 8, 10 ** 9]
+
+
+def _done(path):
+    "Was path completely written by an earlier run?"
+    return os.path.exists(path + '.done')
+
+
+def _mark_done(path):
+    open(path + '.done', 'w').close()
+
+
+def many_small_tiffs(nfiles, shape=TIFF_SMALL_SHAPE):
+    """
+    Write nfiles single-page uint16 TIFFs and return a glob matching them.
+    """
+    import numpy
+    import tifffile
+
+    directory = os.path.join(DATA_DIR, f'small-tiffs-{nfiles}-{shape[0]}x{shape[1]}')
+    if not _done(directory):
+        os.makedirs(directory, exist_ok=True)
+        rng = numpy.random.default_rng(0)
+        for i in range(nfiles):
+            page = rng.integers(0, 2 ** 16, size=shape, dtype='u2')
+            tifffile.imwrite(os.path.join(directory, f'{i:06}.tif'), page)
+        _mark_done(directory)
+    return os.path.join(directory, '*.tif')
+
+
+def tiff_stack(npages, shape=TIFF_PAGE_SHAPE):
+    """
+    Write one multi-page uint16 TIFF and return its path.
+
+    Pages are generated one at a time, so even a large stack does not have
+    to fit in memory.
+    """
+    import numpy
+    import tifffile
+
+    path = os.path.join(DATA_DIR, f'stack-{npages}-{shape[0]}x{shape[1]}.tif')
+    if not _done(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        rng = numpy.random.default_rng(0)
+        page = rng.integers(0, 2 ** 16, size=shape, dtype='u2')
+        pages = (numpy.roll(page, i, axis=0) for i in range(npages))
+        tifffile.imwrite(path, pages, shape=(npages,) + shape, dtype='u2',
+                         bigtiff=npages * page.nbytes > 2 ** 31)
+        _mark_done(path)
+    return path
+
+
+def fwf_table(nbytes):
+    """
+    Write a fixed-width table of about nbytes and return its path.
+
+    It has an integer, a float, and a string column, and lines of equal
+    length (so the 'numpy' engine of FWFReader can read it).
+    """
+    import numpy
+
+    path = os.path.join(DATA_DIR, f'table-{nbytes}.txt')
+    if not _done(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        rng = numpy.random.default_rng(0)
+        header = f"{'id':>10}{'value':>14}{'code':>6}\n"
+        nrows = 10_000
+        codes = ['a', 'bb', 'ccc', 'dddd']
+        with open(path, 'w') as file:
+            file.write(header)
+            written = len(header)
+            row = 0
+            while written < nbytes:
+                values = rng.normal(size=nrows)
+                chunk = ''.join(
+                    f"{row + j:>10}{values[j]:>14.6f}{codes[(row + j) % 4]:>6}\n"
+                    for j in range(nrows))
+                file.write(chunk)
+                written += len(chunk)
+                row += nrows
+        _mark_done(path)
+    return path
+
+
+def main():
+    for nfiles in TIFF_NFILES:
+        print(many_small_tiffs(nfiles))
+    for npages in TIFF_NPAGES:
+        print(tiff_stack(npages))
+    for nbytes in FWF_NBYTES:
+        print(fwf_table(nbytes))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
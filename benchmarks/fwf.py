@@ -0,0 +1,49 @@
+"""
+Benchmarks of FWFDataSource over fixed-width tables from MB to GB.
+"""
+from .data import FWF_NBYTES, fwf_table
+
+
+class FWF:
+    params = [FWF_NBYTES, ['pandas', 'numpy']]
+    param_names = ['nbytes', 'engine']
+    timeout = 1200
+
+    def setup(self, nbytes, engine):
+        from my_fwf_package import FWFDataSource
+
+        self.path = fwf_table(nbytes)
+        # A source whose metadata is loaded, for the partition benchmarks
+        self.source = FWFDataSource(self.path, engine=engine)
+        self.source.discover()
+
+    def teardown(self, nbytes, engine):
+        self.source.close()
+
+    def time_construct(self, nbytes, engine):
+        from my_fwf_package import FWFDataSource
+
+        FWFDataSource(self.path, engine=engine)
+
+    def time_discover(self, nbytes, engine):
+        from my_fwf_package import FWFDataSource
+
+        with FWFDataSource(self.path, engine=engine) as source:
+            source.discover()
+
+    def time_read(self, nbytes, engine):
+        self.source.read()
+
+    def time_read_partition(self, nbytes, engine):
+        self.source.read_partition(0)
+
+    def time_read_chunked(self, nbytes, engine):
+        for _ in self.source.read_chunked():
+            pass
+
+    def peakmem_read(self, nbytes, engine):
+        self.source.read()
+
+    def peakmem_read_chunked(self, nbytes, engine):
+        for _ in self.source.read_chunked():
+            pass
@@ -0,0 +1,18 @@
+"""
+Import-time benchmarks, each run in a fresh interpreter.
+"""
+from .importtime import PACKAGES, heavy_imports, import_times
+
+
+class Import:
+    params = PACKAGES
+    param_names = ['package']
+
+    def timeraw_import(self, package):
+        return f"import {package}"
+
+    def track_heavy_imports(self, package):
+        "Number of heavy dependencies imported along with the package"
+        return len(heavy_imports(import_times(f"import {package}")))
+
+    track_heavy_imports.unit = 'modules'
@@ -0,0 +1,72 @@
+"""
+Measure what importing each package costs, using python -X importtime.
+
+Run as a script to check that no package pulls in a heavy dependency at
+import time:
+
+    python benchmarks/importtime.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+PACKAGES = ('reader_adapter', 'my_tiff_package', 'my_fwf_package')
+# Importing any of these should be deferred until data is read.
+HEAVY = ('dask', 'numpy', 'pandas', 'tifffile', 'xarray', 'yaml')
+
+
+def import_times(statement):
+    """
+    Run statement in a fresh interpreter and return a dict mapping each module
+    it imported to its cumulative import time in microseconds.
+    """
+    result = _run(['-X', 'importtime', '-c', statement])
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def module_file(package):
+    "The file that a fresh interpreter imports package from, or None."
+    path = _run(['-c', f"import {package}; print({package}.__file__)"]).stdout.strip()
+    return None if path == 'None' else path
+
+
+def _run(args):
+    # Run outside the repository, whose directories named like the packages
+    # would otherwise be found first on sys.path and imported, empty, as
+    # namespace packages.
+    with tempfile.TemporaryDirectory() as cwd:
+        return subprocess.run([sys.executable, *args], cwd=cwd,
+                              capture_output=True, text=True, check=True)
+
+
+def heavy_imports(times):
+    "The heavy dependencies among the modules in times."
+    return sorted({name.split('.')[0] for name in times} & set(HEAVY))
+
+
+def main():
+    failed = False
+    for package in PACKAGES:
+        path = module_file(package)
+        if path is None or os.path.basename(os.path.dirname(path)) != package:
+            print(f"{package}: imported from {path}, not from the package")
+            failed = True
+            continue
+        times = import_times(f"import {package}")
+        heavy = heavy_imports(times)
+        print(f"{package}: {times[package] / 1000:.1f} ms"
+              f"{', imports ' + ', '.join(heavy) if heavy else ''}")
+        failed = failed or bool(heavy)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Benchmarks of TIFFDataSource over many small files and one large stack.
+"""
+from .data import TIFF_NFILES, TIFF_NPAGES, many_small_tiffs, tiff_stack
+
+
+class _TIFF:
+    timeout = 600
+
+    def setup(self, *params):
+        from my_tiff_package import TIFFDataSource
+
+        self.path = self.generate(*params)
+        # A source whose metadata is loaded, for the partition benchmarks
+        self.source = TIFFDataSource(self.path)
+        self.source.discover()
+
+    def teardown(self, *params):
+        self.source.close()
+
+    def time_construct(self, *params):
+        from my_tiff_package import TIFFDataSource
+
+        TIFFDataSource(self.path)
+
+    def time_discover(self, *params):
+        from my_tiff_package import TIFFDataSource
+
+        with TIFFDataSource(self.path) as source:
+            source.discover()
+
+    def time_read(self, *params):
+        self.source.read()
+
+    def time_read_partition(self, *params):
+        self.source.read_partition((0, 0, 0))
+
+    def time_read_chunked(self, *params):
+        for _ in self.source.read_chunked():
+            pass
+
+    def peakmem_read(self, *params):
+        self.source.read()
+
+    def peakmem_read_chunked(self, *params):
+        for _ in self.source.read_chunked():
+            pass
+
+
+class TIFFManySmallFiles(_TIFF):
+    params = TIFF_NFILES
+    param_names = ['nfiles']
+
+    def generate(self, nfiles):
+        return many_small_tiffs(nfiles)
+
+
+class TIFFStack(_TIFF):
+    params = TIFF_NPAGES
+    param_names = ['npages']
+
+    def generate(self, npages):
+        return tiff_stack(npages)
@@ -6,8 +6,8 @@ reader = my_fwf_package.FWFReader('example_data/table.txt')
 reader.read()
 reader.close()
 
-# The wrapped-in-DataSource version implements most of the API (except cache
-# and persist).
+# The wrapped-in-DataSource version implements most of the API (except
+# intake's cache).
 data_source = my_fwf_package.FWFDataSource('example_data/table.txt')
 data_source.discover()
 data_source.read()
@@ -16,6 +16,17 @@ data_source.read_partition(0)
 data_source.to_dask()
 data_source.close()
 
+# Categories that do not appear in the first rows are kept, in both engines,
+# whether the file is read whole or a partition at a time.
+for engine in ('pandas', 'numpy'):
+    with my_fwf_package.FWFDataSource('example_data/regions.txt', engine=engine,
+                                      blocksize=256, dtype={'region': 'category'}) as data_source:
+        counts = data_source.read()['region'].value_counts().to_dict()
+        assert counts == {'north': 19, 'south': 7, 'east': 7, 'west': 7}, counts
+        for i in range(data_source.npartitions):
+            partition = data_source.read_partition(i)
+            assert partition['region'].notna().all()
+
 # It works in a catalog.
 import intake
 catalog = intake.open_catalog('catalog.yml')
@@ -12,6 +12,8 @@ def main():
     tifffile.imwrite(os.path.join(directory, 'coffee.tiff'), coffee)
     stack = skimage.data.lfw_subset()
     tifffile.imwrite(os.path.join(directory, 'lfw_subset_as_stack.tif'), stack)
+    tifffile.imwrite(os.path.join(directory, 'lfw_subset_tiled_zlib.tif'),
+                     stack, tile=(16, 16), compression='zlib')
     subdirectory = os.path.join(directory, 'series')
     os.makedirs(subdirectory, exist_ok=True)
     for i, plane in enumerate(stack):
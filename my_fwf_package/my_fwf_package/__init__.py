@@ -1,18 +1,68 @@
-import dask.dataframe
+import glob
+import io
+import os
 
 
 class FWFReader:
     """
     Accepts file, filepath, or filepath glob.
+
+    Row counts, read_partition(i) and read_rows(start, stop) are served from
+    an index of the byte offset of every line, built with one pass over each
+    file the first time it is needed. They seek straight to the lines they
+    need and parse only those.
+
+    Parameters
+    ----------
+    file: str or file buffer
+        Filepath, filepath glob, or file buffer
+    blocksize: int, optional
+        Size in bytes of the blocks that become partitions. 64 MB by default.
+    index: bool, optional
+        If True, save the line index of each file in a sidecar file,
+        ``<filepath>.lines.npy``, and memory-map it from there, rebuilding it
+        when the file is newer. Otherwise, keep it in memory. False by
+        default.
+    columns: list, optional
+        Names of the columns to return. Others are not parsed at all. By
+        default, all columns are returned.
+    colspecs: list, optional
+        (start, end) character extents of every column in the file, as for
+        pandas.read_fwf. By default, these are inferred from the first 100
+        lines.
+    dtype: dict, optional
+        Maps column names to dtypes, overriding inference. 'category' is
+        supported.
+    engine: {'pandas', 'numpy'}, optional
+        The 'numpy' engine requires that all lines (after the header) have the
+        same length. It views each block of lines as a 2-D array of bytes,
+        slices out the projected columns, and converts each one in bulk, which
+        is much faster than pandas.read_fwf. 'pandas' by default.
     """
     container = 'dask.dataframe.core.DataFrame'
+    pushdown = ('columns',)
 
-    def __init__(self, file):
+    def __init__(self, file, blocksize=64_000_000, index=False, columns=None,
+                 colspecs=None, dtype=None, engine='pandas'):
+        if engine not in ('pandas', 'numpy'):
+            raise ValueError(f"engine must be 'pandas' or 'numpy', not {engine!r}")
         # read_fwf requires a filepath and will not accept a file buffer.
         if isinstance(file, str):
             self._filepath = file
         else:
             self._filepath = file.name
+        self._blocksize = blocksize
+        self._index = index
+        self._columns = None if columns is None else list(columns)
+        self._colspecs = None if colspecs is None else [tuple(c) for c in colspecs]
+        self._dtype = dtype
+        self._engine = engine
+        self._line_indexes = {}  # maps filepath to array of line offsets
+        self._line_widths = {}  # maps filepath to length of each data line
+        self._partitions = None  # see _partition_lines()
+        self._head = None  # see _head_rows()
+        self._names = None  # see _head_rows()
+        self._dtypes = None  # see _head_rows()
         self._closed = False
 
     def __repr__(self):
@@ -21,11 +71,278 @@ class FWFReader:
     def read(self):
         if self._closed:
             raise Closed(f"{self} is closed and can no longer be read.")
-        return dask.dataframe.read_fwf(self._filepath)
+        import dask.dataframe
+        import pandas
+
+        if self._engine == 'numpy':
+            from dask.dataframe.utils import clear_known_categories
+
+            head = self._head_rows()
+            parts = [dask.delayed(self._parse_lines)(filepath, start, stop)
+                     for filepath, start, stop in self._partition_lines()]
+            # Each partition has the categories in its own rows, unless they
+            # were given, so those in the first rows are not known for all.
+            unknown = [name for name, dtype in self._dtypes.items()
+                       if isinstance(dtype, pandas.CategoricalDtype) and
+                       dtype.categories is None]
+            meta = clear_known_categories(head.iloc[:0], cols=unknown)
+            return dask.dataframe.from_delayed(parts, meta=meta)
+        kwargs = {}
+        if self._colspecs is not None:
+            kwargs['colspecs'] = self._colspecs
+        if self._columns is not None:
+            kwargs['usecols'] = self._columns
+        if self._dtype is not None:
+            kwargs['dtype'] = self._dtype
+        df = dask.dataframe.read_fwf(self._filepath, blocksize=self._blocksize,
+                                     **kwargs)
+        if self._columns is not None:
+            # usecols keeps the order of the file, not of columns.
+            df = df[self._columns]
+        return df
+
+    def discover(self):
+        """
+        Describe what read() would return, from the first rows alone.
+
+        Row counts are included only if the line index of every file is
+        loaded or saved already, since building one takes a pass over the
+        file.
+        """
+        if self._closed:
+            raise Closed(f"{self} is closed and can no longer be read.")
+        head = self._head_rows()
+        filepaths = self._filepaths()
+        npartitions = sum(len(_block_offsets(os.path.getsize(filepath),
+                                             self._blocksize))
+                          for filepath in filepaths)
+        info = {'dtype': {name: str(dtype)
+                          for name, dtype in head.dtypes.to_dict().items()},
+                'shape': (None, len(head.columns)),
+                'npartitions': npartitions}
+        if all(map(self._has_line_index, filepaths)):
+            info['row_counts'] = self.row_counts()
+        return info
+
+    def row_counts(self):
+        """
+        Count the rows in each partition without parsing them.
+        """
+        if self._closed:
+            raise Closed(f"{self} is closed and can no longer be read.")
+        return [stop - start for _, start, stop in self._partition_lines()]
+
+    def read_partition(self, i):
+        """
+        Parse just the lines of partition i, the same rows as read() has there.
+        """
+        if self._closed:
+            raise Closed(f"{self} is closed and can no longer be read.")
+        filepath, start, stop = self._partition_lines()[i]
+        return self._parse_lines(filepath, start, stop)
+
+    def read_rows(self, start, stop):
+        """
+        Parse rows [start, stop), counting across files, and nothing else.
+
+        The result is indexed by row number.
+        """
+        if self._closed:
+            raise Closed(f"{self} is closed and can no longer be read.")
+        import pandas
+
+        if not 0 <= start <= stop:
+            raise ValueError(
+                f"Expected 0 <= start <= stop, not start={start}, stop={stop}")
+        frames = []
+        first_row = 0  # row number of the first row of the current file
+        for filepath in self._filepaths():
+            # The first line in each file is a header.
+            nrows = max(len(self._line_index(filepath)) - 2, 0)
+            lo = max(start - first_row, 0)
+            hi = min(stop - first_row, nrows)
+            if lo < hi:
+                frames.append(self._parse_lines(filepath, 1 + lo, 1 + hi))
+            first_row += nrows
+            if first_row >= stop:
+                break
+        if frames:
+            df = pandas.concat(frames, ignore_index=True)
+        else:
+            df = self._head_rows().iloc[:0]
+        df.index = pandas.RangeIndex(start, start + len(df))
+        return df
+
+    def _filepaths(self):
+        if os.path.isfile(self._filepath):
+            return [self._filepath]
+        filepaths = sorted(glob.glob(self._filepath))
+        if not filepaths:
+            raise FileNotFoundError(f"{self._filepath} resolved to no files")
+        return filepaths
+
+    def _head_rows(self):
+        """
+        Return the first rows of the first file, with only the projected
+        columns, and learn the column layout.
+        """
+        import pandas
+        from dask.dataframe.utils import pyarrow_strings_enabled
+
+        if self._head is None:
+            filepath = self._filepaths()[0]
+            if self._colspecs is None:
+                with open(filepath) as file:
+                    lines = [line for line, _ in zip(file, range(_INFER_ROWS))]
+                self._colspecs = _infer_colspecs(lines)
+            # dask infers column names and dtypes from the first rows of the
+            # first file (sample_rows=10), so do the same.
+            head = pandas.read_fwf(filepath, nrows=_SAMPLE_ROWS,
+                                   colspecs=self._colspecs, dtype=self._dtype)
+            self._names = list(head.columns)
+            if self._columns is not None:
+                head = head[self._columns]
+            if pyarrow_strings_enabled():
+                # read() has strings as dask stores them by default (its
+                # dataframe.convert-string option), so parse them so too.
+                head = head.astype({name: pandas.StringDtype('pyarrow')
+                                    for name, dtype in head.dtypes.items()
+                                    if dtype == object})
+            dtypes = head.dtypes.to_dict()
+            for name, dtype in dtypes.items():
+                if isinstance(dtype, pandas.CategoricalDtype):
+                    # The head's categories are only those in its first rows;
+                    # other rows may have more, unless categories were given.
+                    requested = (self._dtype.get(name) if isinstance(self._dtype, dict)
+                                 else self._dtype)
+                    dtypes[name] = pandas.api.types.pandas_dtype(requested)
+            self._dtypes = dtypes
+            self._head = head
+        return self._head
+
+    def _line_index(self, filepath):
+        """
+        Return the byte offset of the start of every line in a file, followed
+        by the size of the file.
+        """
+        import numpy
+
+        if filepath in self._line_indexes:
+            return self._line_indexes[filepath]
+        if self._index:
+            sidecar = f"{filepath}.lines.npy"
+            if not self._has_line_index(filepath):
+                tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as file:
+                    numpy.save(file, _build_line_index(filepath))
+                os.replace(tmp_path, sidecar)
+            line_index = numpy.load(sidecar, mmap_mode='r')
+        else:
+            line_index = _build_line_index(filepath)
+        self._line_indexes[filepath] = line_index
+        return line_index
+
+    def _has_line_index(self, filepath):
+        "Can the line index of a file be had without a pass over it?"
+        if filepath in self._line_indexes:
+            return True
+        sidecar = f"{filepath}.lines.npy"
+        return (self._index and os.path.exists(sidecar) and
+                os.path.getmtime(sidecar) >= os.path.getmtime(filepath))
+
+    def _partition_lines(self):
+        """
+        Return (filepath, start, stop) for each partition, where lines
+        [start, stop) of the file are the rows in the partition.
+
+        Partition boundaries are found the way dask finds them: the line
+        break at or after each block offset.
+        """
+        import numpy
+
+        if self._partitions is None:
+            partitions = []
+            for filepath in self._filepaths():
+                line_index = self._line_index(filepath)
+                nlines = len(line_index) - 1
+                blocks = _block_offsets(os.path.getsize(filepath),
+                                        self._blocksize)
+                if not blocks:
+                    continue
+                # The line starting just past the first line break at or after
+                # each block offset, or the end of the file.
+                starts = [min(int(numpy.searchsorted(line_index, offset + 1)),
+                              nlines)
+                          for offset, _ in blocks[1:]]
+                # Skip the header line in the first block.
+                starts = [min(1, nlines)] + starts
+                stops = starts[1:] + [nlines]
+                partitions.extend((filepath, start, stop)
+                                  for start, stop in zip(starts, stops))
+            self._partitions = partitions
+        return self._partitions
+
+    def _line_width(self, filepath):
+        """
+        Return the length of every data line, including the line break, for
+        the numpy engine, which requires them all to be the same.
+        """
+        import numpy
+
+        if filepath not in self._line_widths:
+            lengths = numpy.diff(self._line_index(filepath)[1:])
+            width = int(lengths.max()) if len(lengths) else 0
+            # The last line may be one short, lacking a line break.
+            if len(lengths) and not (numpy.all(lengths[:-1] == width) and
+                                     lengths[-1] in (width, width - 1)):
+                raise ValueError(
+                    f"The numpy engine requires lines of equal length, but "
+                    f"{filepath} has lines of lengths "
+                    f"{sorted(set(lengths.tolist()))[:10]}")
+            self._line_widths[filepath] = width
+        return self._line_widths[filepath]
+
+    def _parse_lines(self, filepath, start, stop):
+        import pandas
+
+        head = self._head_rows()
+        if start >= stop:
+            return head.iloc[:0].reset_index(drop=True)
+        line_index = self._line_index(filepath)
+        with open(filepath, 'rb') as file:
+            file.seek(int(line_index[start]))
+            data = file.read(int(line_index[stop] - line_index[start]))
+        if self._engine == 'numpy':
+            return self._parse_lines_numpy(filepath, data, stop - start)
+        df = pandas.read_fwf(io.BytesIO(data), colspecs=self._colspecs,
+                             header=None, names=self._names,
+                             usecols=self._columns, dtype=self._dtype)
+        if self._columns is not None:
+            df = df[self._columns]
+        return _coerce_dtypes(df, self._dtypes)
+
+    def _parse_lines_numpy(self, filepath, data, nrows):
+        import numpy
+        import pandas
+
+        width = self._line_width(filepath)
+        lines = numpy.frombuffer(data, dtype='u1')
+        if lines.size < nrows * width:
+            # The last line lacks a line break.
+            lines = numpy.append(lines, numpy.uint8(ord('\n')))
+        lines = lines.reshape(nrows, width)
+        # _parse_lines has called _head_rows(), which sets _dtypes.
+        colspecs = dict(zip(self._names, self._colspecs))
+        columns = {}
+        for name, dtype in self._dtypes.items():
+            start, stop = colspecs[name]
+            field = lines[:, start:min(stop, width - 1)]
+            columns[name] = _convert_field(field, dtype)
+        return _coerce_dtypes(pandas.DataFrame(columns), self._dtypes)
 
     def close(self):
         self._closed = True
-        # Nothing to clean up.
+        self._line_indexes.clear()
 
     def __enter__(self):
         return self
@@ -38,6 +355,177 @@ class Closed(Exception):
     ...
 
 
+_SAMPLE_ROWS = 10
+_INFER_ROWS = 100  # as in pandas.read_fwf
+_READ_SIZE = 2 ** 20
+# Strings that pandas reads as missing values by default (its na_values)
+_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null'])
+_NA_BYTES = [value.encode() for value in _NA_VALUES]
+
+
+def _block_offsets(size, blocksize):
+    """
+    Split a file into (offset, length) blocks exactly as dask.bytes does.
+    """
+    if size == 0:
+        return []
+    # shrink blocksize to give same number of parts
+    if size % blocksize and size > blocksize:
+        blocksize1 = size / (size // blocksize)
+    else:
+        blocksize1 = blocksize
+    place = 0
+    offsets = [0]
+    while size - place > (blocksize1 * 2) - 1:
+        place += blocksize1
+        offsets.append(int(place))
+    return [(offset, end - offset)
+            for offset, end in zip(offsets, offsets[1:] + [size])]
+
+
+def _build_line_index(filepath):
+    "Find the start of every line with one pass over the file."
+    import numpy
+
+    parts = [numpy.zeros(1, dtype='u8')]
+    position = 0
+    with open(filepath, 'rb') as file:
+        while True:
+            data = file.read(_READ_SIZE)
+            if not data:
+                break
+            line_breaks = numpy.flatnonzero(
+                numpy.frombuffer(data, dtype='u1') == ord('\n'))
+            parts.append((line_breaks + (position + 1)).astype('u8'))
+            position += len(data)
+    line_index = numpy.concatenate(parts)
+    if line_index[-1] != position:
+        # The last line does not end with a line break.
+        line_index = numpy.append(line_index, numpy.uint64(position))
+    return line_index
+
+
+def _infer_colspecs(lines, delimiters=' \t'):
+    """
+    Infer column extents from the characters used in some lines.
+
+    This is the algorithm pandas.read_fwf uses for colspecs='infer'.
+    """
+    import numpy
+
+    max_len = max(map(len, lines))
+    mask = numpy.zeros(max_len + 1, dtype=int)
+    for line in lines:
+        for j, char in enumerate(line):
+            if char not in delimiters:
+                mask[j] = 1
+    shifted = numpy.roll(mask, 1)
+    shifted[0] = 0
+    edges = numpy.where((mask ^ shifted) == 1)[0]
+    return [(int(a), int(b)) for a, b in zip(edges[::2], edges[1::2])]
+
+
+def _as_bytes(field):
+    "View a 2-D uint8 array as a 1-D array of fixed-length byte strings."
+    import numpy
+
+    field = numpy.ascontiguousarray(field)
+    return field.view(f'S{field.shape[1]}').ravel()
+
+
+def _parse_integers(field):
+    """
+    Parse a 2-D uint8 array of right- or left-justified integers in bulk.
+
+    Returns None if the field holds anything but digits, spaces, and signs,
+    or if any value is missing.
+    """
+    import numpy
+
+    digits = field - numpy.uint8(ord('0'))  # non-digits wrap around to >= 10
+    is_digit = digits < 10
+    is_minus = field == ord('-')
+    if not numpy.all(is_digit | is_minus | (field == ord(' ')) |
+                     (field == ord('+'))):
+        return None
+    if not numpy.all(is_digit.any(axis=1)):
+        return None
+    values = numpy.zeros(len(field), dtype='i8')
+    for j in range(field.shape[1]):
+        values = numpy.where(is_digit[:, j], values * 10 + digits[:, j], values)
+    return numpy.where(is_minus.any(axis=1), -values, values)
+
+
+def _coerce_dtypes(df, dtypes):
+    """
+    Cast the columns of a parsed block to the dtypes read() has, which are
+    inferred from the first rows.
+
+    As dask does for each block, raise rather than lose values that do not
+    fit, such as fractions in a column of integers.
+    """
+    from pandas.api.types import is_float_dtype, is_integer_dtype
+
+    mismatched = []
+    for name in df.columns:
+        found, expected = df.dtypes[name], dtypes[name]
+        if found == expected:
+            continue
+        if is_float_dtype(found) and is_integer_dtype(expected):
+            mismatched.append((name, found, expected))
+            continue
+        try:
+            df[name] = df[name].astype(expected)
+        except (TypeError, ValueError):
+            mismatched.append((name, found, expected))
+    if mismatched:
+        raise ValueError(
+            "Mismatched dtypes found in a block of rows, as compared with the "
+            "first rows: " +
+            ", ".join(f"{name!r} is {found}, not {expected}"
+                      for name, found, expected in mismatched) +
+            ". Specify them with dtype={...}.")
+    return df
+
+
+def _convert_field(field, dtype):
+    """
+    Convert a 2-D uint8 array, one row per line, into a column, of dtype if
+    the values allow it (see _coerce_dtypes).
+    """
+    import numpy
+    import pandas
+
+    if isinstance(dtype, pandas.CategoricalDtype) and dtype.categories is None:
+        strings = numpy.char.strip(_as_bytes(field))
+        missing = numpy.isin(strings, _NA_BYTES)
+        categories, present_codes = numpy.unique(strings[~missing],
+                                                 return_inverse=True)
+        codes = numpy.full(len(strings), -1, dtype=present_codes.dtype)
+        codes[~missing] = present_codes
+        return pandas.Categorical.from_codes(
+            codes, [category.decode() for category in categories])
+    if dtype.kind in 'iu':
+        values = _parse_integers(field)
+        if values is not None:
+            return values.astype(dtype)
+    elif dtype.kind == 'f':
+        try:
+            return _as_bytes(field).astype(dtype)
+        except ValueError:
+            pass  # missing values, probably
+    # Anything else, or anything unusual: let pandas convert the strings.
+    strings = pandas.Series(numpy.char.strip(_as_bytes(field))).str.decode('utf-8')
+    strings = strings.mask(strings.isin(_NA_VALUES))
+    if dtype.kind in 'iufb':
+        # Floats, if any value is missing or fractional.
+        return pandas.to_numeric(strings).values
+    return strings.astype(dtype).values
+
+
 # intake compatibility
 from reader_adapter import adapt  # noqa
 FWFDataSource = adapt(FWFReader, 'FWFDataSource')
@@ -1,27 +1,111 @@
-import dask.array
-import tifffile
+import bisect
+import collections
+import contextlib
+import itertools
+import json
+import os
+import sys
+import threading
 
 
 class TIFFReader:
     """
     Accepts file, filepath, or filepath glob.
+
+    Files are not opened until they are needed. Open handles are drawn from a
+    pool that keeps at most ``max_open_files`` of them open at once, closing
+    the least recently used one and reopening files on demand.
+
+    Parameters
+    ----------
+    file: str or file buffer
+        Filepath, filepath glob, or file buffer
+    memmap: bool, optional
+        If True, serve pages that are stored uncompressed, contiguous, and in
+        native byte order as read-only numpy.memmap views into the file,
+        without decoding them into a new buffer. Other pages are decoded as
+        usual. False by default.
+    max_open_files: int, optional
+        Maximum number of files held open at once. 128 by default.
+    index: str, optional
+        Path to a JSON sidecar caching the shape, dtype, and page layout of
+        each file. It is read, if it exists, on first use, and entries for new
+        or modified files are added to it. Without it, every file has to be
+        opened once to learn its shape.
+    pages_per_chunk: int, optional
+        Number of consecutive pages of a file to read together as one block
+        (and one partition). 1 by default. Pages that are stored contiguously
+        in the file are read with a single I/O into one pre-allocated block.
+    chunk_bytes: int, optional
+        Alternatively, a target block size in bytes; pages_per_chunk is then
+        chosen per file to fit as many whole pages as possible.
+    level: int, optional
+        Level of resolution to read, from 0 (full resolution, the default)
+        down; see levels(). Files that have sub-resolution levels of their
+        own (pyramidal TIFFs) are read at those. For other files, each level
+        halves the one above it along Y and X, and is computed when it is
+        first read and then kept in ``level_cache``.
+    downsample: {'mean', 'stride'}, optional
+        How computed levels are coarsened: by the mean of each 2x2 block (the
+        default) or by taking every other pixel.
+    level_cache: str, optional
+        Directory in which to keep computed levels. By default, a directory
+        under the system's temporary directory.
+    decode_workers: int, optional
+        Size of a pool of workers, shared by everything this reader reads,
+        that decodes encoded pages. However many dask tasks are reading, no
+        more than this many decode at once. By default, tifffile decodes each
+        page with threads of its own.
+    decode_executor: {'thread', 'process'} or concurrent.futures.Executor
+        With threads (the default), the tiles or strips of each page are
+        decoded in parallel, directly into the page's block. With processes,
+        whole pages are decoded in parallel (and copied back). An Executor may
+        be given instead, in which case decode_workers is ignored.
     """
     container = 'dask.array.core.Array'
 
-    def __init__(self, file):
+    def __init__(self, file, memmap=False, max_open_files=128, index=None,
+                 pages_per_chunk=1, chunk_bytes=None, level=0,
+                 downsample='mean', level_cache=None, decode_workers=None,
+                 decode_executor='thread'):
+        if pages_per_chunk < 1:
+            raise ValueError("pages_per_chunk must be at least 1")
+        if level < 0:
+            raise ValueError("level must be at least 0")
+        if downsample not in ('mean', 'stride'):
+            raise ValueError("downsample must be 'mean' or 'stride'")
+        self._pool = _TiffFilePool(max_open_files)
+        self._decoder = None
+        if decode_workers is not None or decode_executor != 'thread':
+            self._decoder = _DecodePool(decode_workers, decode_executor)
         if isinstance(file, str):
             # file is a filepath or filepath glob
-            import os
             if os.path.isfile(file):
-                self._tiff_files = [tifffile.TiffFile(file)]
+                self._keys = [file]
             else:
                 import glob
-                self._tiff_files = [tifffile.TiffFile(file_)
-                                    for file_ in glob.glob(file)]
+                self._keys = glob.glob(file)
         else:
-            # file is a file buffer
-            self._tiff_files = [tifffile.TiffFile(file)]
+            # file is a file buffer, which we cannot reopen, so the pool
+            # holds onto it for the lifetime of the reader.
+            if self._decoder is not None and self._decoder.processes:
+                raise ValueError("Pages of a file buffer cannot be decoded "
+                                 "in other processes.")
+            self._keys = [0]
+            self._pool.add_buffer(0, file)
         self._file = file  # only used in __repr__
+        self._memmap = memmap
+        self._index_path = index
+        self._pages_per_chunk = pages_per_chunk
+        self._chunk_bytes = chunk_bytes
+        self._level = level
+        self._downsample = downsample
+        self._level_cache = level_cache
+        self._index = None  # contents of the sidecar index; see _describe()
+        self._index_changed = False
+        self._base_info = None  # list of dicts, one per file, at level 0
+        self._info = None  # list of dicts, one per file; see _file_infos()
+        self._sources = None  # key of each file (or computed level) to read
         self._closed = False
 
     def __repr__(self):
@@ -30,21 +114,248 @@ class TIFFReader:
     def read(self):
         if self._closed:
             raise Closed(f"{self} is closed and can no longer be read.")
-        stack = []
-        for tf in self._tiff_files:
-            assert len(tf.series) == 1  # should be True by construction
-            series = tf.series[0]
-            dtype = series.dtype
-            for page in series.pages:
-                stack.append(dask.array.from_delayed(
-                    dask.delayed(page.asarray)(),
-                    shape=page.shape, dtype=dtype))
-        return dask.array.stack(stack)
+        import dask.array
+        import numpy
+
+        blocks = []
+        for key, info, start, stop in self._page_runs():
+            dtype = numpy.dtype(info['dtype'])
+            shape = tuple(info['shape'])
+            page_nbytes = int(numpy.prod(shape)) * dtype.itemsize
+            block_shape = (stop - start,) + shape
+            offset = _contiguous_offset(info['offsets'][start:stop],
+                                        page_nbytes)
+            if (self._memmap and offset is not None and
+                    isinstance(key, str) and
+                    _is_native(info['byteorder'], dtype)):
+                delayed_block = dask.delayed(_memmap_pages)(
+                    key, offset, dtype, block_shape)
+            else:
+                delayed_block = dask.delayed(_read_pages)(
+                    self._pool, key, info['level'], start, stop, offset,
+                    info['byteorder'], dtype, shape, self._decoder)
+            blocks.append(dask.array.from_delayed(
+                delayed_block, shape=block_shape, dtype=dtype))
+        return dask.array.concatenate(blocks)
+
+    def discover(self):
+        """
+        Describe what read() would return, from the file headers alone.
+        """
+        if self._closed:
+            raise Closed(f"{self} is closed and can no longer be read.")
+        infos = self._file_infos()
+        shapes = {tuple(info['shape']) for info in infos}
+        dtypes = {info['dtype'] for info in infos}
+        if len(shapes) != 1 or len(dtypes) != 1:
+            raise ValueError(
+                f"{self} matches files with differing page shapes {shapes} "
+                f"or dtypes {dtypes}, which cannot be stacked.")
+        shape, = shapes
+        dtype, = dtypes
+        page_chunks = tuple(stop - start for _, _, start, stop in self._page_runs())
+        return {'dtype': dtype,
+                'shape': (sum(page_chunks),) + shape,
+                'chunks': (page_chunks,) + tuple((n,) for n in shape)}
+
+    def read_region(self, index):
+        """
+        Read array[index] for a tuple of one int or slice per axis.
+
+        The ints must be non-negative and the slices must have explicit,
+        in-range bounds and a positive step, as reader_adapter passes them.
+        Only the pages in the region are read and, of those, only the rows
+        (of pages stored unencoded) or the tiles or strips (of encoded pages)
+        that overlap it.
+        """
+        import numpy
+
+        info = self.discover()
+        dtype = numpy.dtype(info['dtype'])
+        shape = tuple(len(range(item.start, item.stop, item.step))
+                      for item in index if isinstance(item, slice))
+        out = numpy.empty(shape, dtype=dtype)
+        if not out.size:
+            return out
+        pages, page_region = index[0], index[1:]
+        if isinstance(pages, slice):
+            pages = range(pages.start, pages.stop, pages.step)
+        else:
+            pages = [pages]
+            out = out[numpy.newaxis]
+        # Find the file holding each page by its position in the stack.
+        infos = self._file_infos()
+        starts = list(itertools.accumulate(
+            [0] + [file_info['npages'] for file_info in infos]))
+        for j, page in enumerate(pages):
+            n = bisect.bisect_right(starts, page) - 1
+            out[j] = _read_page_region(
+                self._pool, self._sources[n], infos[n], page - starts[n],
+                page_region, dtype, self._memmap, self._decoder)
+        return out if isinstance(index[0], slice) else out[0]
+
+    def levels(self):
+        """
+        Return the shape of the stack at each level of resolution, from full
+        resolution (level 0) down.
+
+        If the files have sub-resolution levels of their own, these are they.
+        Otherwise, levels halve along Y and X down to the first that fits in
+        a thumbnail of _THUMBNAIL_SIZE pixels. (Nothing is computed here.)
+        """
+        if self._closed:
+            raise Closed(f"{self} is closed and can no longer be read.")
+        infos = self._base_infos()
+        npages = sum(info['npages'] for info in infos)
+        nlevels = min(info['nlevels'] for info in infos)
+        if any(info['nlevels'] > 1 for info in infos):
+            shapes = [tuple(self._describe(self._keys[0], level)['shape'])
+                      for level in range(nlevels)]
+        else:
+            shape = tuple(infos[0]['shape'])
+            axes = infos[0]['axes']
+            shapes = [shape]
+            if 'Y' in axes and 'X' in axes:
+                while max(shape[axes.index('Y')],
+                          shape[axes.index('X')]) > _THUMBNAIL_SIZE:
+                    shape = _coarsened_shape(shape, axes)
+                    shapes.append(shape)
+        self._save_index()
+        return [(npages,) + shape for shape in shapes]
+
+    def _page_runs(self):
+        """
+        Yield (key, info, start, stop) for each run of pages read as a block.
+        """
+        import numpy
+
+        infos = self._file_infos()  # also sets self._sources
+        for key, info in zip(self._sources, infos):
+            step = self._pages_per_chunk
+            if self._chunk_bytes is not None:
+                page_nbytes = (int(numpy.prod(info['shape'])) *
+                               numpy.dtype(info['dtype']).itemsize)
+                step = max(1, self._chunk_bytes // page_nbytes)
+            for start in range(0, info['npages'], step):
+                yield key, info, start, min(start + step, info['npages'])
+
+    def _file_infos(self):
+        """
+        Return the page count, page shape, and dtype of each file, at our
+        level, and note where to read each (in self._sources).
+
+        Coarsened levels of files that have none of their own are computed,
+        if they are not already cached, on first use.
+        """
+        if self._info is not None:
+            return self._info
+        sources = []
+        infos = []
+        for key, info in zip(self._keys, self._base_infos()):
+            if self._level and info['nlevels'] > 1:
+                info = self._describe(key, self._level)
+            elif self._level:
+                key = self._computed_level(key, info, self._level)
+                info = self._describe(key)
+            sources.append(key)
+            infos.append(info)
+        self._save_index()
+        self._sources = sources
+        self._info = infos
+        return infos
+
+    def _base_infos(self):
+        "Return the info of each file at full resolution."
+        if self._base_info is None:
+            self._base_info = [self._describe(key) for key in self._keys]
+        return self._base_info
+
+    def _describe(self, key, level=0):
+        """
+        Return the page count, page shape, dtype, and layout of one level of
+        one file.
+
+        These are served from the sidecar index when it is present and up to
+        date. Otherwise, the file is opened (through the pool) to find out.
+        """
+        if self._index is None:
+            self._index = _load_index(self._index_path)
+        stat = _stat(key)
+        entry = key if level == 0 else f"{key}::level{level}"
+        info = self._index.get(entry)
+        # (Entries written before levels were recorded are out of date too.)
+        if info is None or info['stat'] != stat or 'nlevels' not in info:
+            with self._pool.acquire(key) as tf:
+                assert len(tf.series) == 1  # should be True by construction
+                series = tf.series[0]
+                if level >= len(series.levels):
+                    raise ValueError(
+                        f"{key!r} has {len(series.levels)} levels of "
+                        f"resolution, so there is no level {level}.")
+                pages = [_level_page(tf, level, i)
+                         for i in range(len(series.levels[level]))]
+                # Record where each page's data starts, for pages whose
+                # data can be read from the file as-is without decoding.
+                offsets = [page.dataoffsets[0] if page.is_final else None
+                           for page in pages]
+                info = {'stat': stat,
+                        'level': level,
+                        'nlevels': len(series.levels),
+                        'npages': len(pages),
+                        'shape': list(pages[0].shape),
+                        'axes': pages[0].axes,
+                        'dtype': str(series.levels[level].dtype),
+                        'byteorder': tf.byteorder,
+                        'offsets': offsets}
+            if isinstance(key, str):
+                self._index[entry] = info
+                self._index_changed = True
+        return info
+
+    def _save_index(self):
+        if self._index_changed and self._index_path is not None:
+            _write_index(self._index_path, self._index)
+        self._index_changed = False
+
+    def _computed_level(self, key, info, level):
+        """
+        Return the path of a coarsened copy of a file that has no levels of
+        its own, computing it from the level above if it is not cached.
+        """
+        import hashlib
+
+        if not isinstance(key, str):
+            raise ValueError("Levels cannot be computed for a file buffer.")
+        if 'Y' not in info['axes'] or 'X' not in info['axes']:
+            raise ValueError(f"{key!r} has pages with axes {info['axes']!r} "
+                             f"and cannot be coarsened along Y and X.")
+        directory = self._level_cache
+        if directory is None:
+            import tempfile
+
+            directory = os.path.join(tempfile.gettempdir(),
+                                     'my_tiff_package_levels')
+        # Name the copy after the file's path and version, so that a
+        # modified file gets new levels.
+        name = hashlib.blake2b(json.dumps(
+            [os.path.abspath(key), info['stat'], level, self._downsample]
+        ).encode(), digest_size=16).hexdigest()
+        path = os.path.join(directory, f"{name}.tif")
+        if not os.path.exists(path):
+            if level == 1:
+                finer = key
+            else:
+                finer = self._computed_level(key, info, level - 1)
+            os.makedirs(directory, exist_ok=True)
+            _write_coarsened(self._pool, finer, self._describe(finer), path,
+                             self._downsample, self._decoder)
+        return path
 
     def close(self):
         self._closed = True
-        for tf in self._tiff_files:
-            tf.close()
+        self._pool.close()
+        if self._decoder is not None:
+            self._decoder.close()
 
     def __enter__(self):
         return self
@@ -57,6 +368,516 @@ class Closed(Exception):
     ...
 
 
+_NATIVE_BYTEORDER = '<' if sys.byteorder == 'little' else '>'
+
+
+def _is_native(byteorder, dtype):
+    """
+    Can data in this byte order be used in place, without swapping?
+
+    We insist on this for memmap so that the blocks match the dtype that
+    read() advertises.
+    """
+    return dtype.itemsize == 1 or byteorder == _NATIVE_BYTEORDER
+
+
+def _contiguous_offset(offsets, page_nbytes):
+    """
+    If these pages are stored back-to-back without encoding, return the
+    offset of the first. Otherwise, return None.
+    """
+    if any(offset is None for offset in offsets):
+        return None
+    for previous, offset in zip(offsets, offsets[1:]):
+        if offset != previous + page_nbytes:
+            return None
+    return offsets[0]
+
+
+def _memmap_pages(path, offset, dtype, shape):
+    import numpy
+
+    return numpy.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+
+def _level_page(tf, level, i):
+    "Return page i of one level of resolution of a file's only series."
+    series = tf.series[0]
+    if level and series.pages[0].subifds:
+        # Levels stored as SubIFDs of each full-resolution page, as tifffile
+        # writes them, are reached through that page. (tifffile looks for
+        # all but the first of them in the main chain of IFDs instead.)
+        return tf.pages[series.pages[i].index].pages[level - 1]
+    return series.levels[level].pages[i]
+
+
+def _read_pages(pool, key, level, start, stop, offset, byteorder, dtype,
+                shape, decoder=None):
+    "Read pages [start, stop) of a level of a file into one new block."
+    import numpy
+
+    out = numpy.empty((stop - start,) + shape, dtype=dtype)
+    if offset is None and decoder is not None and decoder.processes:
+        # The decoding processes open the file themselves.
+        futures = [decoder.executor().submit(_decode_in_worker, key, level, i)
+                   for i in range(start, stop)]
+        for j, result in enumerate(_results(futures)):
+            out[j] = result
+        return out
+    with pool.acquire(key) as tf:
+        if offset is not None:
+            # The pages are contiguous and unencoded: one read does it all.
+            fh = tf.filehandle
+            with fh.lock:
+                fh.seek(offset)
+                fh.read_array(byteorder + dtype.char, out.size, out=out)
+        else:
+            for j, i in enumerate(range(start, stop)):
+                _decode_page(tf, _level_page(tf, level, i), out[j], decoder)
+    return out
+
+
+def _decode_page(tf, page, out, decoder):
+    "Decode a page into out, with the decoder's threads if it has them."
+    if decoder is None or decoder.processes:
+        page.asarray(out=out)
+    else:
+        # out is a new C-contiguous block, so this reshape is a view.
+        _decode_segments(tf, page, range(len(page.dataoffsets)),
+                         out.reshape(page.keyframe.shaped), (0, 0, 0, 0),
+                         decoder.executor())
+
+
+def _decode_segments(tf, page, indices, out, origin, executor=None):
+    """
+    Decode the given tiles or strips of a page into out.
+
+    out is shaped like the page's normalized shape (separate samples, depth,
+    length, width, contiguous samples), or a window into it whose first four
+    coordinates start at origin. Segments are read in turn and, given an
+    executor, decoded on it in parallel.
+    """
+    keyframe = page.keyframe
+    decodeargs = {}
+    if keyframe.compression in _JPEG_COMPRESSIONS:
+        decodeargs = {'jpegtables': page.jpegtables,
+                      'jpegheader': keyframe.jpegheader}
+
+    def decode(data, index):
+        segment, position, shape = keyframe.decode(data, index, **decodeargs)
+        s, d, y, x = (p - o for p, o in zip(position, origin))
+        # Slicing clips tiles at the far edges, which are padded beyond the
+        # image, to out.
+        view = out[s, d:d + shape[0], y:y + shape[1], x:x + shape[2]]
+        if segment is None:
+            view[...] = 0  # an empty segment
+        else:
+            view[...] = segment[:view.shape[0], :view.shape[1], :view.shape[2]]
+
+    fh = tf.filehandle
+    segments = fh.read_segments([page.dataoffsets[i] for i in indices],
+                                [page.databytecounts[i] for i in indices],
+                                indices=list(indices), lock=fh.lock, sort=True)
+    if executor is None:
+        for data, index in segments:
+            decode(data, index)
+    else:
+        futures = [executor.submit(decode, data, index)
+                   for data, index in segments]
+        for _ in _results(futures):
+            pass
+
+
+def _results(futures):
+    "Yield the results of futures in order, cancelling the rest on error."
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _read_page_region(pool, key, info, i, region, dtype, memmap,
+                      decoder=None):
+    "Read region, a tuple of one int or slice per axis, of page i of a file."
+    import numpy
+
+    shape = tuple(info['shape'])
+    offset = info['offsets'][i]
+    if offset is not None:
+        # The page is stored unencoded, in C order: read only the span of
+        # its first axis that the region covers.
+        start, stop = _span(region[0])
+        row_nbytes = int(numpy.prod(shape[1:])) * dtype.itemsize
+        offset += start * row_nbytes
+        rows_shape = (stop - start,) + shape[1:]
+        if (memmap and isinstance(key, str) and
+                _is_native(info['byteorder'], dtype)):
+            rows = numpy.memmap(key, dtype=dtype, mode='r', offset=offset,
+                                shape=rows_shape)
+        else:
+            rows = numpy.empty(rows_shape, dtype=dtype)
+            with pool.acquire(key) as tf:
+                fh = tf.filehandle
+                with fh.lock:
+                    fh.seek(offset)
+                    fh.read_array(info['byteorder'] + dtype.char, rows.size,
+                                  out=rows)
+        return rows[(_shift(region[0], start),) + region[1:]]
+    with pool.acquire(key) as tf:
+        page = _level_page(tf, info['level'], i)
+        keyframe = page.keyframe
+        if keyframe.shaped[:2] != (1, 1) or shape[:2] != keyframe.shaped[2:4]:
+            # Separate sample planes or volumetric tiles: decode it all.
+            out = numpy.empty(shape, dtype=dtype)
+            _decode_page(tf, page, out, decoder)
+            return out[region]
+        executor = None
+        if decoder is not None and not decoder.processes:
+            executor = decoder.executor()
+        return _read_segments(tf, page, region, dtype, executor)
+
+
+def _read_segments(tf, page, region, dtype, executor=None):
+    """
+    Decode only the tiles or strips of a page that overlap region.
+
+    The page must be a single plane, of shape (length, width) or (length,
+    width, samples).
+    """
+    import numpy
+
+    keyframe = page.keyframe
+    _, _, length, width, samples = keyframe.shaped
+    if keyframe.is_tiled:
+        segment_length, segment_width = keyframe.tilelength, keyframe.tilewidth
+    else:
+        segment_length, segment_width = keyframe.rowsperstrip, width
+    segments_across = -(-width // segment_width)
+    row_start, row_stop = _span(region[0])
+    column_start, column_stop = _span(region[1])
+    rows = range(row_start // segment_length,
+                 -(-row_stop // segment_length))
+    columns = range(column_start // segment_width,
+                    -(-column_stop // segment_width))
+    indices = [row * segments_across + column
+               for row in rows for column in columns]
+    # Decode the segments into a buffer spanning just those segments.
+    top = rows.start * segment_length
+    left = columns.start * segment_width
+    bottom = min(length, rows.stop * segment_length)
+    right = min(width, columns.stop * segment_width)
+    buffer = numpy.empty((1, 1, bottom - top, right - left, samples),
+                         dtype=dtype)
+    _decode_segments(tf, page, indices, buffer, (0, 0, top, left), executor)
+    buffer = buffer[0, 0]
+    if len(keyframe.shape) == 2:
+        buffer = buffer[..., 0]
+    return buffer[(_shift(region[0], top), _shift(region[1], left)) +
+                  region[2:]]
+
+
+_THUMBNAIL_SIZE = 256  # see TIFFReader.levels()
+
+
+def _coarsened_shape(shape, axes):
+    "The shape of a page once halved along Y and X."
+    return tuple(-(-n // 2) if axis in 'YX' else n
+                 for n, axis in zip(shape, axes))
+
+
+def _coarsen(page, axes, downsample):
+    "Halve a page along Y and X, by the mean of each block or by striding."
+    import numpy
+
+    if downsample == 'stride':
+        return page[tuple(slice(None, None, 2) if axis in 'YX' else slice(None)
+                          for axis in axes)]
+    out = page
+    for i, axis in enumerate(axes):
+        if axis in 'YX':
+            # Blocks at the far edge may have only one pixel on this axis.
+            starts = numpy.arange(0, out.shape[i], 2)
+            counts = numpy.diff(numpy.append(starts, out.shape[i]))
+            counts = counts.reshape([-1 if j == i else 1
+                                     for j in range(out.ndim)])
+            out = numpy.add.reduceat(out, starts, axis=i, dtype='float64')
+            out /= counts
+    if page.dtype.kind in 'biu':
+        numpy.rint(out, out=out)
+    return out.astype(page.dtype)
+
+
+def _write_coarsened(pool, key, info, path, downsample, decoder=None):
+    "Write a copy of a file (or one level of it), halved along Y and X."
+    import numpy
+    import tifffile
+
+    dtype = numpy.dtype(info['dtype'])
+    shape = tuple(info['shape'])
+    axes = info['axes']
+
+    def pages():
+        # One page at a time, to keep memory use down.
+        for i, offset in enumerate(info['offsets']):
+            page, = _read_pages(pool, key, info['level'], i, i + 1, offset,
+                                info['byteorder'], dtype, shape, decoder)
+            yield _coarsen(page, axes, downsample)
+
+    coarsened_shape = (info['npages'],) + _coarsened_shape(shape, axes)
+    planarconfig = None
+    if axes.endswith('S'):
+        planarconfig = 'contig'
+    elif axes.startswith('S'):
+        planarconfig = 'separate'
+    # Write uncompressed, so that pages can be read (or memmapped) directly.
+    # As for the index, write to a temporary file and rename it into place.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    nbytes = int(numpy.prod(coarsened_shape)) * dtype.itemsize
+    tifffile.imwrite(tmp_path, pages(), shape=coarsened_shape, dtype=dtype,
+                     photometric='minisblack', planarconfig=planarconfig,
+                     metadata=None, bigtiff=nbytes > 2 ** 31)
+    os.replace(tmp_path, path)
+
+
+_JPEG_COMPRESSIONS = {6, 7, 33007, 34892}  # decoded with JPEG tables/header
+
+
+def _span(item):
+    "Return the [first, last + 1) span of positions selected by an int or slice."
+    if isinstance(item, slice):
+        last = range(item.start, item.stop, item.step)[-1]
+        return item.start, last + 1
+    return item, item + 1
+
+
+def _shift(item, offset):
+    "Shift an int or slice by -offset."
+    if isinstance(item, slice):
+        return slice(item.start - offset, item.stop - offset, item.step)
+    return item - offset
+
+
+class _TiffFilePool:
+    """
+    A bounded, least-recently-used pool of open TiffFile handles.
+
+    Handles that are in use are never closed out from under their user; the
+    pool may briefly exceed its maximum size if all of them are busy. Several
+    threads may use one handle at once, so each is opened with a lock that
+    tifffile holds around every seek and read.
+
+    Files are opened and closed outside the pool's lock, so that threads
+    reading different files open them in parallel; a per-file lock makes
+    threads that want the same file wait for one of them to open it.
+    """
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("max_open_files must be at least 1")
+        self._maxsize = maxsize
+        self._handles = collections.OrderedDict()  # maps key to TiffFile
+        self._users = collections.Counter()  # maps key to number of users
+        self._opening = {}  # maps key to lock held while opening it
+        self._buffers = {}  # maps key to TiffFile that cannot be reopened
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def add_buffer(self, key, buffer):
+        self._buffers[key] = _open(buffer)
+
+    @contextlib.contextmanager
+    def acquire(self, key):
+        if key in self._buffers:
+            yield self._buffers[key]
+            return
+        with self._lock:
+            if self._closed:
+                raise Closed("The TIFF file pool is closed.")
+            # Counting this user first keeps the handle from being evicted.
+            self._users[key] += 1
+            tf = self._handles.get(key)
+            if tf is not None:
+                self._handles.move_to_end(key)
+            else:
+                opening = self._opening.setdefault(key, threading.Lock())
+        try:
+            if tf is None:
+                tf = self._open(key, opening)
+            self._evict()
+            yield tf
+        finally:
+            with self._lock:
+                self._users[key] -= 1
+                if not self._users[key]:
+                    del self._users[key]
+                    if key not in self._handles:
+                        # Opening failed, or the pool was closed meanwhile.
+                        self._opening.pop(key, None)
+            self._evict()
+
+    def _open(self, key, opening):
+        "Open key, holding only its own lock, unless another thread has."
+        with opening:
+            with self._lock:
+                tf = self._handles.get(key)
+                if tf is not None:
+                    self._handles.move_to_end(key)
+                    return tf
+            tf = _open(key)
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._handles[key] = tf
+            if closed:
+                tf.close()
+                raise Closed("The TIFF file pool is closed.")
+            return tf
+
+    def _evict(self):
+        unused = []
+        with self._lock:
+            excess = len(self._handles) - self._maxsize
+            for key in list(self._handles):
+                if excess <= 0:
+                    break
+                if not self._users[key]:
+                    unused.append(self._handles.pop(key))
+                    self._opening.pop(key, None)
+                    excess -= 1
+        for tf in unused:
+            tf.close()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            handles = list(self._handles.values())
+            self._handles.clear()
+            self._opening.clear()
+        for tf in handles:
+            tf.close()
+        for tf in self._buffers.values():
+            tf.close()
+
+    def __getstate__(self):
+        # Open handles cannot travel to another process; they are reopened
+        # there on demand. File buffers cannot be reopened at all.
+        if self._buffers:
+            raise TypeError("A TIFFReader on a file buffer cannot be pickled.")
+        return {'maxsize': self._maxsize, 'closed': self._closed}
+
+    def __setstate__(self, state):
+        self.__init__(state['maxsize'])
+        self._closed = state['closed']
+
+
+def _open(source):
+    "Open a TiffFile whose handle can be shared between threads."
+    import tifffile
+
+    tf = tifffile.TiffFile(source)
+    # The default lock is a no-op, which leaves seek-then-read pairs racing.
+    tf.filehandle.set_lock(True)
+    return tf
+
+
+class _DecodePool:
+    """
+    A pool of threads or processes for decoding pages, started on first use.
+    """
+    def __init__(self, workers, executor='thread'):
+        import concurrent.futures
+
+        if isinstance(executor, concurrent.futures.Executor):
+            self._executor = executor
+            self._owned = False
+        elif executor in ('thread', 'process'):
+            if workers is not None and workers < 1:
+                raise ValueError("decode_workers must be at least 1")
+            self._executor = None
+            self._owned = True
+        else:
+            raise ValueError("decode_executor must be 'thread', 'process', "
+                             "or a concurrent.futures.Executor")
+        self._workers = workers
+        self._kind = executor
+        self._lock = threading.Lock()
+        self.processes = (
+            executor == 'process' or
+            isinstance(executor, concurrent.futures.ProcessPoolExecutor))
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                import concurrent.futures
+
+                if self.processes:
+                    import multiprocessing
+
+                    # Do not fork: the reading threads may hold locks.
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        self._workers,
+                        mp_context=multiprocessing.get_context('spawn'))
+                else:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        self._workers, thread_name_prefix='tiff-decode')
+            return self._executor
+
+    def close(self):
+        with self._lock:
+            if self._owned and self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def __getstate__(self):
+        # The workers stay behind; another process starts its own.
+        if not self._owned:
+            raise TypeError("A TIFFReader with a decode Executor of its own "
+                            "cannot be pickled.")
+        return {'workers': self._workers, 'executor': self._kind}
+
+    def __setstate__(self, state):
+        self.__init__(state['workers'], state['executor'])
+
+
+_worker_files = None  # _TiffFilePool of a decoding process
+_WORKER_MAX_OPEN_FILES = 16
+
+
+def _decode_in_worker(key, level, i):
+    "Decode page i of a level of a file, in a decoding process."
+    global _worker_files
+
+    if _worker_files is None:
+        _worker_files = _TiffFilePool(_WORKER_MAX_OPEN_FILES)
+    with _worker_files.acquire(key) as tf:
+        return _level_page(tf, level, i).asarray(maxworkers=1)
+
+
+def _stat(key):
+    "Identify the version of a file, so that stale index entries are ignored."
+    if not isinstance(key, str):
+        return None
+    stat = os.stat(key)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_index(path):
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def _write_index(path, index):
+    # Write to a temporary file and rename it into place so that concurrent
+    # readers never see a partially-written index.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(index, file)
+    os.replace(tmp_path, path)
+
+
 # intake compatibility
 from reader_adapter import adapt  # noqa
 TIFFDataSource = adapt(TIFFReader, 'TIFFDataSource')
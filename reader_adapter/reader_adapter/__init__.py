@@ -1 +1,6 @@
-from ._registry import adapt  # noqa
+from ._registry import adapt, register, register_converter  # noqa
+from ._cache import PartitionCache  # noqa
+from ._shared import ReaderRegistry, readers as shared_readers  # noqa
+from ._instrument import (Event, StatsCollector, add_listener, capture,  # noqa
+                          remove_listener)
+from ._transport import from_partition_buffer  # noqa
@@ -1,11 +1,47 @@
 """
 Adapters for common 'container' types.
 """
+import functools
+import operator
+
 from ._base import Adapter
+from ._instrument import record
 from ._vendored import Schema
 
 
-class DaskArrayAdapter(Adapter):
+class _SliceMixin:
+    """
+    Add read_slice() to an array adapter, which should define _slice(region).
+    """
+    def read_slice(self, index):
+        """
+        Return array[index], computed, for basic indexing.
+
+        If the Reader has a read_region(index) method, the selection is passed
+        on to it so that it reads only what it needs, rather than whole
+        blocks. It is given a tuple with one int or slice per axis, where the
+        ints are non-negative and the slices have explicit, in-range bounds
+        and a positive step. (Negative steps are applied afterwards.)
+
+        Parameters
+        ----------
+        index: int, slice, Ellipsis, or tuple of these
+        """
+        self._load_metadata()
+        region, flip = _normalize_index(index, self.shape)
+        with record('slice', self, index=region) as recorder:
+            read_region = self._reader_hook('read_region')
+            if read_region is not None:
+                result = read_region(region)
+            else:
+                result = self._slice(region)
+            if flip is not None:
+                result = result[flip]
+            recorder.result(result)
+        return result
+
+
+class DaskArrayAdapter(_SliceMixin, Adapter):
     """
     Wrap a Reader that returns a dask.array.core.Array in the DataSource API.
 
@@ -13,10 +49,25 @@ class DaskArrayAdapter(Adapter):
     """
     container = 'ndarray'  # name matching intake's container registry
     _EXPECTED_CONTAINER = 'dask.array.core.Array'  # fully-qualified class name
+    _cache_format = 'npy'  # see PartitionCache
 
-    # Implement the DataSource API in terms of Adapter._adpater_read().
+    # Implement the DataSource API in terms of Adapter._adapter_read().
 
     def _get_schema(self):
+        discover = self._reader_hook('discover')
+        if discover is not None:
+            info = discover()
+            chunks = tuple(tuple(c) for c in info['chunks'])
+            npartitions = 1
+            for c in chunks:
+                npartitions *= len(c)
+            return Schema(
+                datashape=None,
+                dtype=str(info['dtype']),
+                shape=tuple(info['shape']),
+                npartitions=npartitions,
+                chunks=chunks,
+                extra_metadata=info.get('metadata', {}))
         reading = self._adapter_read()
         return Schema(
             datashape=None,
@@ -26,59 +77,918 @@ class DaskArrayAdapter(Adapter):
             chunks=reading.chunks,
             extra_metadata={})
 
-    def _get_partition(self, i):
+    def _get_partition_collection(self, i):
         # This handles that fact that tuples serialize/deserialize as lists in
         # msgpack.
         if isinstance(i, list):
             i = tuple(i)
-        return self._adapter_read().blocks[i].compute()
+        return self._adapter_read().blocks[i]
 
     def read_partition(self, i):
         # Base class assumes the i is an integer, but i is a tuple in our case,
         # so we have to override the base class here.
-        self._get_schema()
+        self._load_metadata()
         return self._get_partition(i)
 
+    def _partition_indices(self):
+        from ._prefetch import iter_block_indices
+
+        return iter_block_indices(tuple(map(len, self._schema.chunks)))
+
+    def read_chunked(self, order='C', max_workers=None, prefetch=None,
+                     executor='thread'):
+        """
+        Return iterator over the blocks of the array.
+
+        Blocks are visited in C or F order over the block grid and computed on
+        a pool, keeping at most ``prefetch`` blocks in flight ahead of the
+        consumer.
+
+        Parameters
+        ----------
+        order: {'C', 'F'}
+            Order in which to walk the block grid.
+        max_workers: int, optional
+            Number of workers. Defaults to the number of CPUs.
+        prefetch: int, optional
+            Maximum number of blocks computed ahead. Defaults to twice
+            ``max_workers``.
+        executor: {'thread', 'process'} or concurrent.futures.Executor
+            Where to compute the blocks. With 'process', the dask graph
+            produced by the Reader must be picklable, and the partition cache
+            is bypassed.
+        """
+        import concurrent.futures
+
+        from ._prefetch import (compute_synchronous, iter_block_indices,
+                                prefetch_map)
+
+        self._load_metadata()
+        reading = self._adapter_read()
+        indices = iter_block_indices(reading.numblocks, order)
+        if (executor == 'process' or
+                isinstance(executor, concurrent.futures.ProcessPoolExecutor)):
+            # Ship the blocks' graphs to the workers, not this source.
+            func = compute_synchronous
+            items = (reading.blocks[index] for index in indices)
+        else:
+            func = functools.partial(self._get_partition,
+                                     scheduler='synchronous')
+            items = indices
+        return prefetch_map(func, items,
+                            max_workers=max_workers, prefetch=prefetch,
+                            executor=executor)
+
+    def levels(self):
+        """
+        Return the shape of the array at each level of resolution that the
+        Reader offers, from full resolution (level 0) down.
+
+        Readers that offer more than one level take a ``level`` argument;
+        see at_level().
+        """
+        levels = self._reader_hook('levels')
+        if levels is None:
+            self._load_metadata()
+            return [self.shape]
+        return [tuple(shape) for shape in levels()]
+
+    def at_level(self, level):
+        """
+        Return a source like this one, but reading the given level of
+        resolution, whose partitions are blocks of that level.
+        """
+        if self._reader_hook('levels') is None:
+            if level == 0:
+                return self
+            raise ValueError(f"{self} has only one level of resolution")
+        kwargs = dict(self._captured_init_kwargs, level=level)
+        return type(self)(*self._captured_init_args, **kwargs)
+
+    def _slice(self, region):
+        return self._adapter_read()[region].compute()
+
     def to_dask(self):
         return self._adapter_read()
 
     def read(self):
         return self._adapter_read().compute()
 
+    @staticmethod
+    def _persist(source, path):
+        """
+        Write the array as one .npy file per block, keeping the block layout.
+        """
+        from ._persist import NPYDataSource, write_chunked_npy
 
-class DaskDataFrameAdapter(Adapter):
+        write_chunked_npy(source.to_dask(), path)
+        return NPYDataSource(path)
+
+
+class _SelectionMixin:
+    """
+    Accept columns= and filters= for a dataframe Adapter.
+
+    Parameters
+    ----------
+    columns: list, optional
+        Names of the columns to return.
+    filters: list, optional
+        Rows to return, as (column, op, value) tuples which must all hold, or
+        a list of such lists, any one of which must hold (as for
+        dask.dataframe.read_parquet). Supported ops are ==, !=, <, <=, >, >=,
+        in, and not in.
+
+    If the Reader's ``pushdown`` attribute includes 'columns' or 'filters',
+    that argument is passed on to the Reader, which can skip reading what is
+    not wanted. Otherwise it is applied here, after reading.
+    """
+    def __init__(self, *args, columns=None, filters=None, **kwargs):
+        self.__selection = None  # will cache the result of _select()
+        # Whatever selection the Reader cannot do itself is done in _select().
+        self.__columns = None
+        self.__filters = None
+        pushdown = getattr(self._reader_class, 'pushdown', ())
+        if filters is not None:
+            filters = _normalize_filters(filters)
+            if 'filters' in pushdown:
+                kwargs['filters'] = filters
+            else:
+                self.__filters = filters
+        if columns is not None:
+            columns = list(columns)
+            if 'columns' in pushdown:
+                if self.__filters is not None:
+                    # The Reader must also return the columns we filter on.
+                    kwargs['columns'] = columns + [
+                        column for column in _filter_columns(self.__filters)
+                        if column not in columns]
+                    self.__columns = columns
+                else:
+                    kwargs['columns'] = columns
+            else:
+                self.__columns = columns
+        super().__init__(*args, **kwargs)
+
+    def _adapter_read(self):
+        if self.__selection is None:
+            with self._reading_lock:
+                if self.__selection is None:
+                    self.__selection = self._select(super()._adapter_read())
+        return self.__selection
+
+    def _select(self, df):
+        """
+        Apply the columns and filters that the Reader did not apply itself.
+
+        This works on dask and pandas DataFrames alike.
+        """
+        if self.__filters is not None:
+            df = df[_filter_mask(df, self.__filters)]
+        if self.__columns is not None:
+            df = df[self.__columns]
+        return df
+
+    def _reader_hook(self, name):
+        hook = super()._reader_hook(name)
+        if hook is None or (self.__columns is None and self.__filters is None):
+            return hook
+        # Adjust the Reader's hooks to the selection made in _select().
+        if name in ('row_counts', 'read_rows') and self.__filters is not None:
+            # Filtering changes the number of rows in unknown ways.
+            return None
+        if name in ('read_partition', 'read_rows'):
+            return lambda *args: self._select(hook(*args))
+        if name == 'discover':
+            def discover():
+                info = dict(hook())
+                nrows, ncolumns = info['shape']
+                if self.__columns is not None:
+                    info['dtype'] = {column: dict(info['dtype'])[column]
+                                     for column in self.__columns}
+                    ncolumns = len(self.__columns)
+                if self.__filters is not None:
+                    nrows = None
+                    info.pop('row_counts', None)
+                info['shape'] = (nrows, ncolumns)
+                return info
+            return discover
+        return hook
+
+
+class DaskDataFrameAdapter(_SelectionMixin, Adapter):
     """
     Wrap a Reader that returns a dask.dataframe.core.DataFrame in the DataSource API.
 
     We expect a subclass to define a _reader_class attribute.
+
+    Accepts columns= and filters= (see _SelectionMixin); all other arguments
+    are as for Adapter.
     """
     container = 'dataframe'  # name matching intake's container registry
     _EXPECTED_CONTAINER = 'dask.dataframe.core.DataFrame'  # fully-qualified class name
+    _cache_format = 'parquet'  # see PartitionCache
+
+    def __init__(self, *args, **kwargs):
+        self.__row_counts = None  # will cache the Reader's row_counts()
+        self.__row_offsets = None  # see row_offsets
+        super().__init__(*args, **kwargs)
 
-    # Implement the DataSource API in terms of Adapter._adpater_read().
+    # Implement the DataSource API in terms of Adapter._adapter_read().
 
     def _get_schema(self):
-        reading = self._adapter_read()
-        # HACK: Is there a public accessor that can get this or do we have to
-        # rely on _meta?
-        dtypes = {name: str(dtype) for name, dtype in
-                  reading._meta.dtypes.to_dict().items()}
+        discover = self._reader_hook('discover')
+        if discover is not None:
+            info = discover()
+            dtypes = dict(info['dtype'])
+            ncolumns = info['shape'][1]
+            npartitions = info['npartitions']
+            metadata = info.get('metadata', {})
+            if info.get('row_counts') is not None and self.__row_counts is None:
+                self.__row_counts = [int(n) for n in info['row_counts']]
+        else:
+            reading = self._adapter_read()
+            # HACK: Is there a public accessor that can get this or do we have
+            # to rely on _meta?
+            dtypes = {name: str(dtype) for name, dtype in
+                      reading._meta.dtypes.to_dict().items()}
+            ncolumns = len(dtypes)
+            npartitions = reading.npartitions
+            metadata = {}
+        # The number of rows in a dask DataFrame is not known without a pass
+        # over the data, and even the Reader's row_counts() may take one (to
+        # find line breaks, say). Only report it if it is known already; if it
+        # is learned later, __set_row_offsets() fills it in.
+        if self.__row_offsets is None and self.__row_counts is not None:
+            self.__row_offsets = _offsets(self.__row_counts)
+        row_offsets = self.__row_offsets
+        nrows = None if row_offsets is None else row_offsets[-1]
         return Schema(
             datashape=None,
             dtype=dtypes,
-            shape=reading.shape,
-            npartitions=reading.npartitions,
-            extra_metadata={})
+            shape=(nrows, ncolumns),
+            npartitions=npartitions,
+            row_offsets=row_offsets,
+            extra_metadata=metadata)
 
-    def _get_partition(self, i):
-        return self._adapter_read().get_partition(i).compute()
+    def _row_counts(self):
+        """
+        Return the number of rows in each partition, or None if unknown.
+
+        This is computed once, from the Reader's row_counts(), if any.
+        """
+        if self.__row_counts is None:
+            row_counts = self._reader_hook('row_counts')
+            if row_counts is not None:
+                self.__row_counts = [int(n) for n in row_counts()]
+        return self.__row_counts
+
+    @property
+    def row_offsets(self):
+        """
+        Partition i holds rows row_offsets[i] up to row_offsets[i + 1].
+
+        These are counted on first use, with the Reader's row_counts(), if
+        any, and are None otherwise. discover() reports them, and the number
+        of rows in ``shape``, once they are known.
+        """
+        if self.__row_offsets is None:
+            row_counts = self._row_counts()
+            if row_counts is not None:
+                self.__set_row_offsets(_offsets(row_counts))
+        return self.__row_offsets
+
+    def __set_row_offsets(self, row_offsets):
+        "Remember row offsets, and complete the schema with them if it is loaded."
+        self.__row_offsets = row_offsets
+        if self._schema is not None:
+            self._schema['row_offsets'] = row_offsets
+            self._schema['shape'] = self.shape = (row_offsets[-1],
+                                                  self._schema['shape'][1])
+
+    def discover(self):
+        info = super().discover()
+        info['row_offsets'] = self.__row_offsets
+        return info
+
+    def _get_partition_collection(self, i):
+        reading = self._adapter_read()
+        if i < 0 or i >= reading.npartitions:
+            raise IndexError('%d is out of range' % i)
+        return reading.get_partition(i)
 
     def read_partition(self, i):
         # The base class implementation works fine in this case.
         return super().read_partition(i)
 
+    def read_partitions(self, indices):
+        self._load_metadata()
+        indices = list(indices)
+        for i in indices:
+            if i < 0 or i >= self.npartitions:
+                raise IndexError('%d is out of range' % i)
+        return super().read_partitions(indices)
+
+    def read_rows(self, start, stop):
+        """
+        Return rows [start, stop) as a pandas DataFrame indexed by row number.
+
+        If the Reader cannot read rows directly, read the partitions that
+        overlap the range and slice them.
+        """
+        _check_row_range(start, stop)
+        self._load_metadata()
+        # Rows are counted, if the Reader can count them, on first use; see
+        # row_offsets. This also completes the schema.
+        row_offsets = self.row_offsets
+        read_rows = self._reader_hook('read_rows')
+        if read_rows is not None:
+            return read_rows(start, stop)
+        import bisect
+        import pandas
+
+        if row_offsets is None:
+            # This takes a full pass over the data, but only once.
+            lengths = self._adapter_read().map_partitions(len).compute()
+            row_offsets = _offsets(map(int, lengths))
+            self.__set_row_offsets(row_offsets)
+        stop = min(stop, row_offsets[-1])
+        if start >= stop:
+            df = self._adapter_read()._meta.iloc[:0]
+        else:
+            first = bisect.bisect_right(row_offsets, start) - 1
+            last = bisect.bisect_left(row_offsets, stop)
+            partitions = self.read_partitions(range(first, last))
+            df = pandas.concat(partitions, ignore_index=True)
+            offset = row_offsets[first]
+            df = df.iloc[start - offset:stop - offset]
+        df.index = pandas.RangeIndex(start, start + len(df))
+        return df
+
+    def iter_batches(self, batch_size=65536, format='pandas', prefetch=1):
+        """
+        Iterate over the rows in batches of batch_size (the last may be
+        shorter), as pandas DataFrames or pyarrow.RecordBatches.
+
+        Partitions are read one at a time, in order, with up to ``prefetch``
+        of them read ahead on a background thread, so that only those and
+        the one being cut into batches are held in memory.
+
+        Parameters
+        ----------
+        batch_size: int
+        format: {'pandas', 'arrow'}
+            With 'arrow', the index is kept (as a column) only if it is named.
+        prefetch: int
+            Number of partitions to read ahead.
+        """
+        from ._prefetch import prefetch_map
+
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if format not in ('pandas', 'arrow'):
+            raise ValueError(f"format must be 'pandas' or 'arrow', not {format!r}")
+        self._load_metadata()
+        # One worker: the point is to overlap reading with consuming, not to
+        # hold several partitions in memory at once.
+        partitions = prefetch_map(
+            functools.partial(self._get_partition, scheduler='synchronous'),
+            range(self.npartitions), max_workers=1, prefetch=prefetch)
+        batches = _rebatch(partitions, batch_size)
+        if format == 'arrow':
+            batches = _record_batches(batches)
+        return batches
+
+    def to_arrow_stream(self, batch_size=65536, prefetch=1):
+        """
+        Return a pyarrow.RecordBatchReader over the rows.
+
+        This reads the first partition now, for the schema. See iter_batches.
+        """
+        import itertools
+
+        import pyarrow
+
+        batches = self.iter_batches(batch_size, format='arrow',
+                                    prefetch=prefetch)
+        first = next(batches, None)
+        if first is None:
+            first, = _record_batches([self._adapter_read()._meta])
+        return pyarrow.RecordBatchReader.from_batches(
+            first.schema, itertools.chain([first], batches))
+
     def to_dask(self):
         return self._adapter_read()
 
     def read(self):
         return self._adapter_read().compute()
+
+    @staticmethod
+    def _persist(source, path, **kwargs):
+        """
+        Write the DataFrame as partitioned Parquet.
+
+        kwargs are passed to dask.dataframe.DataFrame.to_parquet.
+        """
+        from ._persist import ParquetDataSource, write_parquet
+
+        write_parquet(source.to_dask(), path, **kwargs)
+        return ParquetDataSource(path)
+
+
+class NumpyArrayAdapter(_SliceMixin, Adapter):
+    """
+    Wrap a Reader that returns a numpy.ndarray in the DataSource API.
+
+    Partitions are blocks of about 128 MiB along the first axis, indexed like
+    the blocks of a dask array, (i, 0, 0, ...), and served by slicing. No
+    dask graph is built unless to_dask() is called.
+
+    We expect a subclass to define a _reader_class attribute.
+    """
+    container = 'ndarray'  # name matching intake's container registry
+    _EXPECTED_CONTAINER = 'numpy.ndarray'  # fully-qualified class name
+    _cache_format = 'npy'  # see PartitionCache
+
+    def __init__(self, *args, **kwargs):
+        self.__dask = None  # will cache to_dask()
+        super().__init__(*args, **kwargs)
+
+    def _get_schema(self):
+        import numpy
+
+        discover = self._reader_hook('discover')
+        if discover is not None:
+            info = discover()
+            dtype = numpy.dtype(info['dtype'])
+            shape = tuple(info['shape'])
+            metadata = info.get('metadata', {})
+        else:
+            reading = self._adapter_read()
+            dtype = reading.dtype
+            shape = reading.shape
+            metadata = {}
+        chunks = _first_axis_chunks(shape, dtype.itemsize)
+        return Schema(
+            datashape=None,
+            dtype=str(dtype),
+            shape=shape,
+            npartitions=len(chunks[0]) if chunks else 1,
+            chunks=chunks,
+            extra_metadata=metadata)
+
+    def _compute_partitions(self, indices, scheduler=None):
+        reading = self._adapter_read()
+        if not self.chunks:
+            # A 0-d array is one partition.
+            return [reading for _ in indices]
+        offsets = _offsets(self.chunks[0])
+        partitions = []
+        for i in indices:
+            if isinstance(i, (list, tuple)):
+                i, *rest = i
+                if any(rest):
+                    raise IndexError(f"Only the first axis is partitioned: {rest}")
+            if i < 0 or i >= self.npartitions:
+                raise IndexError('%d is out of range' % i)
+            partitions.append(reading[offsets[i]:offsets[i + 1]])
+        return partitions
+
+    @property
+    def chunks(self):
+        self._load_metadata()
+        return self._schema.chunks
+
+    def read_partition(self, i):
+        self._load_metadata()
+        if isinstance(i, list):
+            i = tuple(i)
+        return self._get_partition(i)
+
+    def _partition_indices(self):
+        return [(i,) + (0,) * (len(self.shape) - 1)
+                for i in range(self.npartitions)]
+
+    def read_chunked(self):
+        """
+        Return iterator over the blocks of the array, in order.
+        """
+        self._load_metadata()
+        for i in self._partition_indices():
+            yield self._get_partition(i)
+
+    def to_dask(self):
+        if self.__dask is None:
+            import dask.array
+
+            self.__dask = dask.array.from_array(self._adapter_read(),
+                                                chunks=self.chunks)
+        return self.__dask
+
+    def _slice(self, region):
+        return self._adapter_read()[region]
+
+    def read(self):
+        return self._adapter_read()
+
+    @staticmethod
+    def _persist(source, path):
+        """
+        Write the array as one .npy file per block, keeping the block layout.
+        """
+        return DaskArrayAdapter._persist(source, path)
+
+
+class PandasDataFrameAdapter(_SelectionMixin, Adapter):
+    """
+    Wrap a Reader that returns a pandas.DataFrame in the DataSource API.
+
+    Partitions are row ranges of about 128 MiB, served by slicing. No dask
+    graph is built unless to_dask() is called.
+
+    We expect a subclass to define a _reader_class attribute.
+
+    Accepts columns= and filters= (see _SelectionMixin); all other arguments
+    are as for Adapter.
+    """
+    container = 'dataframe'  # name matching intake's container registry
+    _EXPECTED_CONTAINER = 'pandas.core.frame.DataFrame'  # fully-qualified class name
+    _cache_format = 'parquet'  # see PartitionCache
+
+    def __init__(self, *args, **kwargs):
+        self.__dask = None  # will cache to_dask()
+        self.row_offsets = None
+        super().__init__(*args, **kwargs)
+
+    def _get_schema(self):
+        discover = self._reader_hook('discover')
+        info = discover() if discover is not None else None
+        if info is not None and info['shape'][0] is not None:
+            dtypes = dict(info['dtype'])
+            shape = tuple(info['shape'])
+            metadata = info.get('metadata', {})
+        else:
+            reading = self._adapter_read()
+            dtypes = {name: str(dtype) for name, dtype in
+                      reading.dtypes.to_dict().items()}
+            shape = reading.shape
+            metadata = {}
+        # Estimate the size of a row from the dtypes alone, so that the
+        # partitioning does not depend on having read the data.
+        row_nbytes = sum(map(_itemsize, dtypes.values()))
+        row_offsets = _offsets(_split(shape[0], row_nbytes))
+        return Schema(
+            datashape=None,
+            dtype=dtypes,
+            shape=shape,
+            npartitions=len(row_offsets) - 1,
+            row_offsets=row_offsets,
+            extra_metadata=metadata)
+
+    def _load_metadata(self):
+        super()._load_metadata()
+        # Partition i holds rows row_offsets[i] up to row_offsets[i + 1].
+        self.row_offsets = self._schema.row_offsets
+
+    def discover(self):
+        info = super().discover()
+        info['row_offsets'] = self.row_offsets
+        return info
+
+    def _compute_partitions(self, indices, scheduler=None):
+        reading = self._adapter_read()
+        return [reading.iloc[self.row_offsets[i]:self.row_offsets[i + 1]]
+                for i in indices]
+
+    def read_partitions(self, indices):
+        self._load_metadata()
+        indices = list(indices)
+        for i in indices:
+            if i < 0 or i >= self.npartitions:
+                raise IndexError('%d is out of range' % i)
+        return super().read_partitions(indices)
+
+    def read_rows(self, start, stop):
+        """
+        Return rows [start, stop) as a pandas DataFrame indexed by row number.
+        """
+        import pandas
+
+        _check_row_range(start, stop)
+        df = self._adapter_read().iloc[start:stop]
+        df.index = pandas.RangeIndex(start, start + len(df))
+        return df
+
+    def to_dask(self):
+        if self.__dask is None:
+            import dask.dataframe
+
+            self._load_metadata()
+            self.__dask = dask.dataframe.from_pandas(
+                self._adapter_read(),
+                chunksize=max(1, self.row_offsets[1] - self.row_offsets[0]),
+                sort=False)
+        return self.__dask
+
+    def read(self):
+        return self._adapter_read()
+
+    @staticmethod
+    def _persist(source, path, **kwargs):
+        """
+        Write the DataFrame as partitioned Parquet.
+
+        kwargs are passed to dask.dataframe.DataFrame.to_parquet.
+        """
+        return DaskDataFrameAdapter._persist(source, path, **kwargs)
+
+
+class _XArrayAdapter(Adapter):
+    """
+    Base class for xarray adapters.
+
+    Partitions are blocks of about 128 MiB along the first dimension, indexed
+    by integer and served by slicing. No dask graph is built unless to_dask()
+    is called. Partitions are not cached.
+    """
+    container = 'xarray'  # name matching intake's container registry
+    _cache_format = None  # see PartitionCache
+
+    def __init__(self, *args, **kwargs):
+        self.__dask = None  # will cache to_dask()
+        super().__init__(*args, **kwargs)
+
+    def _partition_dim(self):
+        "The first dimension, along which partitions are sliced, or None."
+        reading = self._adapter_read()
+        return next(iter(reading.dims), None)
+
+    def _dim_offsets(self):
+        "Boundaries of the partitions along _partition_dim()."
+        reading = self._adapter_read()
+        dim = self._partition_dim()
+        if dim is None:
+            return [0, 0]
+        length = reading.sizes[dim]
+        return _offsets(_split(length, reading.nbytes // max(1, length)))
+
+    def _compute_partitions(self, indices, scheduler=None):
+        reading = self._adapter_read()
+        dim = self._partition_dim()
+        if dim is None:
+            return [reading for _ in indices]
+        offsets = self._dim_offsets()
+        return [reading.isel({dim: slice(offsets[i], offsets[i + 1])})
+                for i in indices]
+
+    def to_dask(self):
+        if self.__dask is None:
+            dim = self._partition_dim()
+            offsets = self._dim_offsets()
+            chunks = {} if dim is None else {dim: max(1, offsets[1] - offsets[0])}
+            self.__dask = self._adapter_read().chunk(chunks)
+        return self.__dask
+
+    def read(self):
+        return self._adapter_read()
+
+
+class XArrayDataArrayAdapter(_XArrayAdapter):
+    """
+    Wrap a Reader that returns an xarray.DataArray in the DataSource API.
+
+    We expect a subclass to define a _reader_class attribute.
+    """
+    _EXPECTED_CONTAINER = 'xarray.core.dataarray.DataArray'  # fully-qualified class name
+
+    def _get_schema(self):
+        reading = self._adapter_read()
+        return Schema(
+            datashape=None,
+            dtype=str(reading.dtype),
+            shape=reading.shape,
+            npartitions=len(self._dim_offsets()) - 1,
+            dims=list(reading.dims),
+            coords=list(reading.coords),
+            extra_metadata=dict(reading.attrs))
+
+
+class XArrayDatasetAdapter(_XArrayAdapter):
+    """
+    Wrap a Reader that returns an xarray.Dataset in the DataSource API.
+
+    We expect a subclass to define a _reader_class attribute.
+    """
+    _EXPECTED_CONTAINER = 'xarray.core.dataset.Dataset'  # fully-qualified class name
+
+    def _get_schema(self):
+        reading = self._adapter_read()
+        return Schema(
+            datashape=None,
+            dtype={name: str(var.dtype)
+                   for name, var in reading.data_vars.items()},
+            shape=None,
+            npartitions=len(self._dim_offsets()) - 1,
+            dims=dict(reading.sizes),
+            data_vars=list(reading.data_vars),
+            coords=list(reading.coords),
+            extra_metadata=dict(reading.attrs))
+
+
+_PARTITION_BYTES = 2 ** 27  # 128 MiB, as dask's default array chunk size
+
+
+def _itemsize(dtype):
+    "Bytes per item of a dtype name, counting 8 (a pointer) for pandas' own."
+    import numpy
+
+    try:
+        return numpy.dtype(dtype).itemsize
+    except TypeError:
+        # such as 'category' or 'string'
+        return 8
+
+
+def _split(length, item_nbytes):
+    "Split length items of item_nbytes each into blocks of _PARTITION_BYTES."
+    step = max(1, _PARTITION_BYTES // max(1, item_nbytes))
+    if not length:
+        return (0,)
+    return tuple(min(step, length - start) for start in range(0, length, step))
+
+
+def _check_row_range(start, stop):
+    "Rows are counted from 0; a stop past the last row is allowed."
+    if not 0 <= start <= stop:
+        raise ValueError(
+            f"Expected 0 <= start <= stop, not start={start}, stop={stop}")
+
+
+def _offsets(chunks):
+    "Turn block lengths into block boundaries."
+    offsets = [0]
+    for chunk in chunks:
+        offsets.append(offsets[-1] + chunk)
+    return offsets
+
+
+def _first_axis_chunks(shape, itemsize):
+    "Dask-style chunks for an array split along its first axis only."
+    if not shape:
+        return ()
+    row_nbytes = itemsize
+    for n in shape[1:]:
+        row_nbytes *= n
+    return (_split(shape[0], row_nbytes),) + tuple((n,) for n in shape[1:])
+
+
+def _rebatch(frames, batch_size):
+    "Cut a stream of DataFrames into batch_size rows each (bar the last)."
+    import pandas
+
+    pending = None  # the start of a batch, from the end of the last frame
+    for df in frames:
+        start = 0
+        if pending is not None:
+            start = batch_size - len(pending)
+            pending = pandas.concat([pending, df.iloc[:start]])
+            if len(pending) < batch_size:
+                continue
+            yield pending
+            pending = None
+        for start in range(start, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            if len(batch) < batch_size:
+                pending = batch
+            else:
+                yield batch
+    if pending is not None:
+        yield pending
+
+
+def _record_batches(frames):
+    "Convert a stream of DataFrames to pyarrow.RecordBatches of one schema."
+    import pyarrow
+
+    schema = None
+    for df in frames:
+        if schema is None:
+            preserve_index = any(name is not None for name in df.index.names)
+            batch = pyarrow.RecordBatch.from_pandas(
+                df, preserve_index=preserve_index)
+            schema = batch.schema
+        else:
+            batch = pyarrow.RecordBatch.from_pandas(
+                df, schema=schema, preserve_index=preserve_index)
+        yield batch
+
+
+def _normalize_index(index, shape):
+    """
+    Spell out a basic index as one non-negative int or forward slice per axis.
+
+    Return that and, if any slice went backwards, the index that reverses the
+    affected axes of the result (else None).
+    """
+    if not isinstance(index, tuple):
+        index = (index,)
+    ellipses = [item is Ellipsis for item in index]
+    if sum(ellipses) > 1:
+        raise IndexError("an index can only have a single ellipsis ('...')")
+    if any(ellipses):
+        position = ellipses.index(True)
+        fill = (slice(None),) * (len(shape) - len(index) + 1)
+        index = index[:position] + fill + index[position + 1:]
+    if len(index) > len(shape):
+        raise IndexError(f"too many indices for an array with {len(shape)} "
+                         f"dimensions: {len(index)}")
+    index = index + (slice(None),) * (len(shape) - len(index))
+    region = []
+    flip = []
+    for item, length in zip(index, shape):
+        if isinstance(item, slice):
+            positions = range(*item.indices(length))
+            if positions.step < 0:
+                positions = positions[::-1]
+                flip.append(slice(None, None, -1))
+            else:
+                flip.append(slice(None))
+            if positions:
+                region.append(slice(positions.start, positions[-1] + 1,
+                                    positions.step))
+            else:
+                region.append(slice(0, 0, 1))
+        else:
+            try:
+                position = operator.index(item)
+            except TypeError as err:
+                raise TypeError(
+                    f"Only ints, slices, and Ellipsis are supported, not "
+                    f"{item!r}") from err
+            if not -length <= position < length:
+                raise IndexError(f"index {position} is out of bounds for an "
+                                 f"axis of length {length}")
+            region.append(position % length)
+    if all(item.step is None for item in flip):
+        return tuple(region), None
+    return tuple(region), tuple(flip)
+
+
+_FILTER_OPERATORS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda series, value: series.isin(value),
+    'not in': lambda series, value: ~series.isin(value),
+}
+
+
+def _normalize_filters(filters):
+    """
+    Return filters as a list of lists of (column, op, value) tuples.
+
+    Each inner list is a conjunction; the outer list is a disjunction.
+    """
+    filters = list(filters)
+    if not filters:
+        raise ValueError("filters must not be empty")
+    # Accept a single conjunction, and lists where tuples are expected, as
+    # they come back from msgpack.
+    if not isinstance(filters[0][0], (list, tuple)):
+        filters = [filters]
+    normalized = []
+    for conjunction in filters:
+        conjunction = [tuple(predicate) for predicate in conjunction]
+        if not conjunction:
+            raise ValueError("filters must not contain an empty list")
+        for column, op, value in conjunction:
+            if op not in _FILTER_OPERATORS:
+                raise ValueError(f"Unsupported filter operator {op!r}")
+        normalized.append(conjunction)
+    return normalized
+
+
+def _filter_columns(filters):
+    "Names of the columns that filters refer to, in order of appearance."
+    columns = []
+    for conjunction in filters:
+        for column, _, _ in conjunction:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def _filter_mask(df, filters):
+    "Boolean Series selecting the rows of df that pass normalized filters."
+    mask = None
+    for conjunction in filters:
+        term = None
+        for column, op, value in conjunction:
+            condition = _FILTER_OPERATORS[op](df[column], value)
+            term = condition if term is None else term & condition
+        mask = term if mask is None else mask | term
+    return mask
@@ -0,0 +1,48 @@
+"""
+The thread pool on which the async methods of DataSource run blocking work.
+"""
+import os
+import threading
+
+_lock = threading.Lock()
+_executor = None  # created on first use; see get_executor()
+
+
+def max_workers():
+    """
+    Size of the pool: $READER_ADAPTER_ASYNC_WORKERS, or else the default of
+    concurrent.futures.ThreadPoolExecutor, min(32, CPUs + 4).
+    """
+    value = os.environ.get('READER_ADAPTER_ASYNC_WORKERS')
+    if value is not None:
+        return int(value)
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def get_executor():
+    "Return the pool shared by all sources in this process."
+    global _executor
+    with _lock:
+        if _executor is None:
+            import concurrent.futures
+
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers(), thread_name_prefix='reader_adapter')
+        return _executor
+
+
+async def run_in_pool(func, *args):
+    """
+    Run func(*args) on the pool and await the result.
+
+    At most max_workers() calls run at once; the rest wait in the pool's
+    queue. If the awaiting task is cancelled before func starts, func never
+    runs. (A call that has started runs to completion, and its result is
+    discarded.)
+    """
+    import asyncio
+    import functools
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(),
+                                      functools.partial(func, *args))
@@ -1,3 +1,8 @@
+import threading
+import weakref
+
+from ._cache import PartitionCache
+from ._instrument import record
 from ._vendored import classname, DictSerialiseMixin
 
 
@@ -64,7 +69,8 @@ class DataSource(DictSerialiseMixin):
     def _load_metadata(self):
         """load metadata only if needed"""
         if self._schema is None:
-            self._schema = self._get_schema()
+            with record('schema', self):
+                self._schema = self._get_schema()
             self.datashape = self._schema.datashape
             self.dtype = self._schema.dtype
             self.shape = self._schema.shape
@@ -145,6 +151,67 @@ class DataSource(DictSerialiseMixin):
 
         return self._get_partition(i)
 
+    def _partition_indices(self):
+        """Every partition index, in order, as accepted by read_partition"""
+        return range(self.npartitions)
+
+    # Asynchronous versions of the read methods. These run the blocking work
+    # on a thread pool shared by all sources in the process (see _async), so
+    # they never block the event loop.
+
+    async def _aload_metadata(self):
+        """Load metadata, if needed, without blocking the event loop"""
+        from ._async import run_in_pool
+        if self._schema is None:
+            await run_in_pool(self._load_metadata)
+
+    async def aread(self):
+        """Load entire dataset into a container and return it, asynchronously"""
+        from ._async import run_in_pool
+        await self._aload_metadata()
+        return await run_in_pool(self.read)
+
+    async def aread_partition(self, i):
+        """Return the i-th partition, asynchronously"""
+        from ._async import run_in_pool
+        await self._aload_metadata()
+        return await run_in_pool(self.read_partition, i)
+
+    async def aread_chunked(self, prefetch=None):
+        """Asynchronously iterate over the partitions, in order
+
+        Parameters
+        ----------
+        prefetch: int, optional
+            Maximum number of partitions read ahead of the consumer. Defaults
+            to the size of the shared thread pool. Partitions not yet started
+            are cancelled if iteration stops early.
+        """
+        import asyncio
+        import collections
+        import itertools
+        from ._async import max_workers, run_in_pool
+        await self._aload_metadata()
+        if prefetch is None:
+            prefetch = max_workers()
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+        indices = iter(self._partition_indices())
+        in_flight = collections.deque()
+        try:
+            for i in itertools.islice(indices, prefetch):
+                in_flight.append(asyncio.ensure_future(
+                    run_in_pool(self.read_partition, i)))
+            while in_flight:
+                partition = await in_flight.popleft()
+                for i in itertools.islice(indices, 1):
+                    in_flight.append(asyncio.ensure_future(
+                        run_in_pool(self.read_partition, i)))
+                yield partition
+        finally:
+            for future in in_flight:
+                future.cancel()
+
     def to_dask(self):
         """Return a dask container for this data source"""
         raise NotImplementedError
@@ -204,42 +271,39 @@ class DataSource(DictSerialiseMixin):
         """
         return self.plot
 
-    # def persist(self, ttl=None, **kwargs):
-    #     """Save data from this source to local persistent storage
-
-    #     Parameters
-    #     ----------
-    #     ttl: numeric, optional
-    #         Time to live in seconds. If provided, the original source will
-    #         be accessed and a new persisted version written transparently
-    #         when more than ``ttl`` seconds have passed since the old persisted
-    #         version was written.
-    #     kargs: passed to the _persist method on the base container.
-    #     """
-    #     from ..container import container_map
-    #     from ..container.persist import PersistStore
-    #     import time
-    #     if 'original_tok' in self.metadata:
-    #         raise ValueError('Cannot persist a source taken from the persist '
-    #                          'store')
-    #     if ttl is not None and not isinstance(ttl, (int, float)):
-    #         raise ValueError('Cannot persist using a time to live that is '
-    #                          f'non-numeric. User-provided ttl was {ttl}')
-    #     store = PersistStore()
-    #     out = self._export(store.getdir(self), **kwargs)
-    #     out.metadata.update({
-    #         'ttl': ttl,
-    #         'cat': {} if self.cat is None else self.cat.__getstate__()
-    #     })
-    #     out.name = self.name
-    #     store.add(self._tok, out)
-    #     return out
+    def persist(self, ttl=None, **kwargs):
+        """Save data from this source to local persistent storage
+
+        Parameters
+        ----------
+        ttl: numeric, optional
+            Time to live in seconds. If provided, the original source will
+            be accessed and a new persisted version written transparently
+            when more than ``ttl`` seconds have passed since the old persisted
+            version was written.
+        kargs: passed to the _persist method on the base container.
+        """
+        from ._persist import store
+        if 'original_tok' in self.metadata:
+            raise ValueError('Cannot persist a source taken from the persist '
+                             'store')
+        if ttl is not None and not isinstance(ttl, (int, float)):
+            raise ValueError('Cannot persist using a time to live that is '
+                             f'non-numeric. User-provided ttl was {ttl}')
+        out = self._export(store.getdir(self), **kwargs)
+        out.metadata.update({
+            'ttl': ttl,
+            'cat': {} if self.cat is None else self.cat.__getstate__()
+        })
+        out.name = self.name
+        store.add(self._tok, out)
+        return out
 
     def export(self, path, **kwargs):
         """Save this data for sharing with other people
 
         Creates a copy of the data in a format appropriate for its container,
-        in the location specified (which can be remote, e.g., s3).
+        in the location specified.
 
         Returns the resultant source object, so that you can, for instance,
         add it to a catalog (``catalog.add(source)``) or get its YAML
@@ -248,11 +312,8 @@ class DataSource(DictSerialiseMixin):
         return self._export(path, **kwargs)
 
     def _export(self, path, **kwargs):
-        from ..container import container_map
         import time
-        method = container_map[self.container]._persist
-        # may need to create path - access file-system method
-        out = method(self, path=path, **kwargs)
+        out = self._persist(self, path=path, **kwargs)
         out.description = self.description
         metadata = {'timestamp': time.time(),
                     'original_metadata': self.metadata,
@@ -264,12 +325,17 @@ class DataSource(DictSerialiseMixin):
         out.name = self.name
         return out
 
-    # def get_persisted(self):
-    #     from ..container.persist import store
-    #     return store[self._tok]()
-
     def get_persisted(self):
-        return NotImplementedError
+        """Return the persisted version of this source
+
+        If its time to live has run out, persist this source again first.
+        """
+        from ._persist import store
+        if store.needs_refresh(self._tok):
+            record = store.record(self._tok)
+            return self.persist(ttl=record['metadata'].get('ttl'),
+                                **record['metadata'].get('persist_kwargs', {}))
+        return store[self._tok]
 
     @staticmethod
     def _persist(source, path, **kwargs):
@@ -278,21 +344,19 @@ class DataSource(DictSerialiseMixin):
 
     @property
     def has_been_persisted(self):
-        return False
-
-    # @property
-    # def has_been_persisted(self):
-    #     from ..container.persist import store
-    #     return self._tok in store
+        from ._persist import store
+        return self._tok in store
 
     @property
     def is_persisted(self):
-        return False
+        from ._persist import store
+        return self.metadata.get('original_tok', None) in store
 
-    # @property
-    # def is_persisted(self):
-    #     from ..container.persist import store
-    #     return self.metadata.get('original_tok', None) in store
+
+# Reader hooks that still apply when the reading is converted to another
+# container: aread's result goes through the conversion like read()'s, and
+# the others return computed arrays or shapes.
+_CONTAINER_AGNOSTIC_HOOKS = {'aread', 'read_region', 'levels'}
 
 
 class Adapter(DataSource):
@@ -300,7 +364,8 @@ class Adapter(DataSource):
     Subclass is expected to define the methods:
 
     - _get_schema()
-    - _get_partition(i)
+    - _get_partition_collection(i)  # lazy (dask) object for one partition
+      or, for containers that are not lazy, _compute_partitions(indices)
     - read_partition(i)
     - read()
     - to_dask()
@@ -311,19 +376,84 @@ class Adapter(DataSource):
 
     - container  # name matching intake's container registry
     - _EXPECTED_CONTAINER  # fully-qualified class name
-
+    - _cache_format  # how PartitionCache should store partitions, or None
+
+    Readers may provide optional methods (see _reader_hook) that let the
+    Adapter avoid building the full container:
+
+    - discover(), which _get_schema() should prefer over _adapter_read(). It
+      returns a dict with the keys dtype, shape, chunks (arrays) or
+      npartitions (dataframes), and optionally metadata and, for dataframes,
+      row_counts, if they are known without a pass over the data.
+    - row_counts(), for dataframes, which returns the number of rows in each
+      partition. It may take a pass over the data, so it is called only when
+      rows are first located (see DaskDataFrameAdapter.row_offsets).
+    - read_partition(i), which returns partition i directly, as a computed
+      container, without going through the dask graph.
+    - read_rows(start, stop), for dataframes, which returns a range of rows.
+    - read_region(index), for arrays, which returns array[index], computed,
+      for a tuple of one int or slice per axis (see read_slice).
+    - levels(), for arrays, which returns the shape of the array at each
+      level of resolution that the Reader can read, given a ``level``
+      argument, full resolution first.
+    - aread(), a coroutine equivalent to read(), which the async methods
+      (aread, aread_partition, aread_chunked) await instead of calling read()
+      on a thread.
+
+    Readers may also declare a ``pushdown`` attribute naming the selection
+    arguments (such as 'columns' and 'filters') that they accept, so that an
+    Adapter can pass them on rather than apply them after reading.
+
+    If adapt() fit the Reader to this Adapter by converting its container,
+    the class also has _reader_container, the Reader's container, and
+    _conversions, the functions that take its reading to _EXPECTED_CONTAINER
+    in turn. Only the hooks that do not depend on the container (aread,
+    read_region, and levels) are used then.
+
+    Partitions are cached on disk if a ``partition_cache`` (a PartitionCache
+    or a directory) is given. With ``shared=True``, the Reader and the result
+    of its read() are shared with every other shared source in the process
+    that has the same Reader arguments (see ReaderRegistry). All other
+    arguments are passed to the Reader.
     """
     partition_access = True
-
-    def __init__(self, *args, metadata=None, storage_options=None, **kwargs):
-        # Instantiate and stash our Reader (subclass) instance.
-        self.__reader = self._reader_class(*args, **kwargs)
+    _reader_container = None  # set by adapt() if the Reader's container differs
+    _conversions = ()
+
+    def __init__(self, *args, metadata=None, storage_options=None,
+                 partition_cache=None, shared=False, **kwargs):
+        if isinstance(partition_cache, str):
+            partition_cache = PartitionCache(partition_cache)
+        if partition_cache is not None and self._cache_format is None:
+            raise TypeError(f"{type(self).__name__} cannot cache partitions")
+        self._partition_cache = partition_cache
+        # Partitions are read on many threads at once (see read_chunked and
+        # aread_chunked), and each needs the schema and the reading; let the
+        # first thread build them while the others wait. Reentrant because
+        # building the schema may need the reading.
+        self._reading_lock = threading.RLock()
+        # Instantiate and stash our Reader (subclass) instance, or share one.
+        with record('construct', self):
+            if shared:
+                from ._shared import readers
+                from ._tokenize import tokenize
+                key = tokenize(classname(self._reader_class), args, kwargs)
+                self.__shared = readers.acquire(
+                    key, lambda: self._reader_class(*args, **kwargs))
+                self.__reader = self.__shared.reader
+                # Release the entry when this source is closed or, since
+                # sources are often dropped without closing, collected.
+                self.__release = weakref.finalize(self, readers.release,
+                                                  self.__shared)
+            else:
+                self.__shared = None
+                self.__reader = self._reader_class(*args, **kwargs)
         # Verify that its 'container' matches the type that this adapater
         # expects. If not, the adapter has been misapplied, and we should fail
         # early.
-        if self.__reader.container != self._EXPECTED_CONTAINER:
-            raise TypeError(
-                "Expected Reader with container {self._EXPECTED_CONTAINER!r}")
+        expected = self._reader_container or self._EXPECTED_CONTAINER
+        if self.__reader.container != expected:
+            raise TypeError(f"Expected Reader with container {expected!r}")
         self.__reading = None  # will cache value of self.__reader.read()
 
         super().__init__(metadata=metadata, storage_options=storage_options)
@@ -333,15 +463,156 @@ class Adapter(DataSource):
         Call read() on our Reader and cache the result.
         """
         if self.__reading is None:
-            self.__reading = self.__reader.read()
-            # One more check. Not sure we need/want to be this strict.
-            return_type_name = classname(self.__reading)
-            if return_type_name != self._EXPECTED_CONTAINER:
-                raise TypeError(
-                    f"Expected Reader.read() to returned type "
-                    f"{return_type_name} but type {self._EXPECTED_CONTAINER} "
-                    f"was expected.")
+            with self._reading_lock:
+                if self.__reading is None:
+                    with record('read', self):
+                        if self.__shared is not None:
+                            self.__set_reading(self.__shared.read())
+                        else:
+                            self.__set_reading(self.__reader.read())
         return self.__reading
 
+    def _load_metadata(self):
+        if self._schema is None:
+            with self._reading_lock:
+                super()._load_metadata()
+
+    def __set_reading(self, reading):
+        # One more check. Not sure we need/want to be this strict.
+        expected = self._reader_container or self._EXPECTED_CONTAINER
+        return_type_name = classname(reading)
+        if return_type_name != expected:
+            raise TypeError(
+                f"Expected Reader.read() to returned type "
+                f"{return_type_name} but type {expected} "
+                f"was expected.")
+        for convert in self._conversions:
+            reading = convert(reading)
+        self.__reading = reading
+
+    async def _aload_metadata(self):
+        # If the Reader can read asynchronously, do that on the event loop
+        # rather than calling read() on a thread later.
+        aread = self._reader_hook('aread')
+        if aread is not None and self.__reading is None:
+            if self.__shared is not None:
+                reading = await self.__shared.aread(aread)
+            else:
+                reading = await aread()
+            if self.__reading is None:
+                self.__set_reading(reading)
+        await super()._aload_metadata()
+
+    def _reader_hook(self, name):
+        """
+        Return the Reader's optional method ``name``, or None if it has none.
+        """
+        if self._conversions and name not in _CONTAINER_AGNOSTIC_HOOKS:
+            # The hook would return the Reader's container, not ours.
+            return None
+        return getattr(self.__reader, name, None)
+
+    def _get_partition(self, i, scheduler=None):
+        """
+        Compute one partition, going through the partition cache if any.
+        """
+        cache = self._partition_cache
+        with record('partition', self, index=i) as recorder:
+            if cache is not None:
+                try:
+                    partition = cache.get(self._tok, i, self._cache_format)
+                except KeyError:
+                    recorder.misses += 1
+                else:
+                    recorder.hits += 1
+                    recorder.result(partition)
+                    return partition
+            read_partition = self._reader_hook('read_partition')
+            if read_partition is not None:
+                partition = read_partition(i)
+            else:
+                partition, = self._compute_partitions([i], scheduler=scheduler)
+            if cache is not None:
+                cache.put(self._tok, i, self._cache_format, partition)
+            recorder.result(partition)
+        return partition
+
+    def read_partitions(self, indices):
+        """
+        Return a list of partitions, in the order requested.
+
+        All of the partitions are computed together in one call to
+        dask.compute, so any upstream tasks they share are only run once and
+        the scheduler overhead is paid once rather than per partition. (If the
+        Reader can read partitions directly, it is asked for each in turn.)
+
+        Parameters
+        ----------
+        indices: iterable
+            Partition indices, as accepted by read_partition(i)
+        """
+        self._load_metadata()
+        indices = list(indices)
+        cache = self._partition_cache
+        partitions = [None] * len(indices)
+        missing = []  # positions in indices that were not in the cache
+        with record('partition', self, index=indices) as recorder:
+            for position, i in enumerate(indices):
+                if cache is not None:
+                    try:
+                        partitions[position] = cache.get(
+                            self._tok, i, self._cache_format)
+                        recorder.hits += 1
+                        continue
+                    except KeyError:
+                        recorder.misses += 1
+                missing.append(position)
+            read_partition = self._reader_hook('read_partition')
+            if read_partition is not None:
+                computed = [read_partition(indices[position])
+                            for position in missing]
+            else:
+                computed = self._compute_partitions(
+                    [indices[position] for position in missing])
+            for position, partition in zip(missing, computed):
+                partitions[position] = partition
+                if cache is not None:
+                    cache.put(self._tok, indices[position], self._cache_format,
+                              partition)
+            recorder.result(partitions)
+        return partitions
+
+    def read_partition_buffer(self, i):
+        """
+        Return partition i as (header, frames), for sending without copies.
+
+        header is a dict of plain values describing the partition; frames is
+        a list of bytes-like objects, which for arrays are views of the
+        partition's own memory. Arrays are pickled with protocol 5, with
+        their data out-of-band; DataFrames are serialized as Arrow IPC.
+        from_partition_buffer(header, frames) rebuilds the partition.
+
+        Parameters
+        ----------
+        i: partition index, as accepted by read_partition(i)
+        """
+        from ._transport import to_buffers
+
+        return to_buffers(self.read_partition(i))
+
+    def _compute_partitions(self, indices, scheduler=None):
+        """
+        Compute the lazy objects for these partitions together.
+        """
+        import dask
+
+        collections = [self._get_partition_collection(i) for i in indices]
+        return dask.compute(*collections, scheduler=scheduler)
+
     def _close(self):
-        self.__reader.close()
+        if self.__shared is not None:
+            # Other sources may still be using the Reader. This releases the
+            # entry only once.
+            self.__release()
+        else:
+            self.__reader.close()
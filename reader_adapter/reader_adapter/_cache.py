@@ -0,0 +1,143 @@
+"""
+An on-disk cache of computed partitions.
+"""
+import os
+import warnings
+
+
+class PartitionCache:
+    """
+    Store computed partitions on local disk, keyed by source token and index.
+
+    Arrays are stored as .npy and DataFrames as Parquet (which requires
+    pyarrow or fastparquet). Entries are written to a temporary file and
+    renamed into place, so several processes may share one directory safely.
+    When the total size exceeds ``max_bytes``, the least recently used
+    entries are deleted.
+
+    Parameters
+    ----------
+    directory: str
+        Created if it does not exist.
+    max_bytes: int, optional
+        Maximum total size of the cache. Unbounded by default.
+    """
+    def __init__(self, directory, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}({self.directory!r}, "
+                f"max_bytes={self.max_bytes!r})")
+
+    def __dask_tokenize__(self):
+        return (self.__class__.__name__, self.directory, self.max_bytes)
+
+    def _path(self, tok, i, format):
+        if isinstance(i, (tuple, list)):
+            i = '-'.join(map(str, i))
+        suffix, _, _ = _FORMATS[format]
+        return os.path.join(self.directory, f"{tok}-{i}{suffix}")
+
+    def get(self, tok, i, format):
+        """
+        Return the cached partition, or raise KeyError if it is not cached.
+        """
+        path = self._path(tok, i, format)
+        _, _, load = _FORMATS[format]
+        try:
+            with open(path, 'rb') as file:
+                value = load(file)
+            # Mark the entry as recently used.
+            os.utime(path)
+        except FileNotFoundError:
+            # Never written, or evicted (possibly just now, by another
+            # process).
+            raise KeyError((tok, i))
+        return value
+
+    def put(self, tok, i, format, value):
+        """
+        Store a partition. Failure to write is a warning, not an error.
+        """
+        import tempfile
+
+        path = self._path(tok, i, format)
+        _, dump, _ = _FORMATS[format]
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                dump(value, file)
+            os.replace(tmp_path, path)
+        except Exception as err:
+            warnings.warn(f"Could not write partition {i!r} to cache: {err!r}")
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            return
+        if self.max_bytes is not None:
+            self._evict()
+
+    def clear(self):
+        "Remove every entry."
+        for entry in self._entries():
+            _remove(entry.path)
+
+    def _entries(self):
+        with os.scandir(self.directory) as it:
+            return [entry for entry in it
+                    if entry.is_file() and not entry.name.endswith('.tmp')]
+
+    def _evict(self):
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        # Another process got there first.
+        pass
+
+
+def _dump_npy(value, file):
+    import numpy
+
+    numpy.save(file, value, allow_pickle=False)
+
+
+def _load_npy(file):
+    import numpy
+
+    return numpy.load(file, allow_pickle=False)
+
+
+def _dump_parquet(value, file):
+    value.to_parquet(file)
+
+
+def _load_parquet(file):
+    import pandas
+
+    return pandas.read_parquet(file)
+
+
+# maps format name to (suffix, dump, load)
+_FORMATS = {
+    'npy': ('.npy', _dump_npy, _load_npy),
+    'parquet': ('.parquet', _dump_parquet, _load_parquet),
+}
@@ -0,0 +1,63 @@
+"""
+Conversions between container types, which adapt() chains to fit a Reader
+to an adapter registered for a different container (see register_converter).
+
+Costs are rough and relative: 1 to wrap a container without copying it, 2
+to copy it in memory, 10 to compute a lazy container.
+"""
+from ._adapters import _first_axis_chunks, _itemsize, _split
+
+
+def numpy_to_dask_array(array):
+    "Wrap an array, in blocks along its first axis, as NumpyArrayAdapter has."
+    import dask.array
+
+    return dask.array.from_array(
+        array, chunks=_first_axis_chunks(array.shape, array.dtype.itemsize))
+
+
+def pandas_to_dask_dataframe(df):
+    "Wrap a DataFrame, in row ranges, as PandasDataFrameAdapter has."
+    import dask.dataframe
+
+    row_nbytes = sum(_itemsize(dtype) for dtype in df.dtypes)
+    chunksize = _split(len(df), row_nbytes)[0]
+    return dask.dataframe.from_pandas(df, chunksize=max(1, chunksize),
+                                      sort=False)
+
+
+def xarray_to_dask_array(data_array):
+    "The dask array behind a DataArray, wrapping it in one if need be."
+    import dask.array
+
+    if isinstance(data_array.data, dask.array.Array):
+        return data_array.data
+    return numpy_to_dask_array(data_array.values)
+
+
+def xarray_to_dask_dataframe(dataset):
+    return dataset.to_dask_dataframe()
+
+
+def arrow_to_pandas(table):
+    return table.to_pandas()
+
+
+def compute(collection):
+    return collection.compute()
+
+
+# (source container, target container, converter, cost)
+BUILTIN_CONVERTERS = [
+    ('numpy.ndarray', 'dask.array.core.Array', numpy_to_dask_array, 1),
+    ('pandas.core.frame.DataFrame', 'dask.dataframe.core.DataFrame',
+     pandas_to_dask_dataframe, 1),
+    ('xarray.core.dataarray.DataArray', 'dask.array.core.Array',
+     xarray_to_dask_array, 1),
+    ('xarray.core.dataset.Dataset', 'dask.dataframe.core.DataFrame',
+     xarray_to_dask_dataframe, 2),
+    ('pyarrow.lib.Table', 'pandas.core.frame.DataFrame', arrow_to_pandas, 2),
+    ('dask.array.core.Array', 'numpy.ndarray', compute, 10),
+    ('dask.dataframe.core.DataFrame', 'pandas.core.frame.DataFrame',
+     compute, 10),
+]
@@ -0,0 +1,262 @@
+"""
+Instrumentation of the expensive steps in using a source: constructing the
+Reader, Reader.read(), schema discovery, and fetching partitions or slices.
+
+Listeners added with add_listener() are called with an Event after each
+step. When there are no listeners, nothing is measured.
+"""
+import contextlib
+import threading
+import time
+import warnings
+
+_listeners = []
+_capture = {'profile': False, 'memory': False}  # see capture()
+_local = threading.local()  # tracks nesting of steps within each thread
+
+
+class Event:
+    """
+    One step in using a source, as passed to listeners.
+
+    Attributes
+    ----------
+    kind: {'construct', 'read', 'schema', 'partition', 'slice'}
+        Construction of the Reader, Reader.read(), schema discovery,
+        fetching a partition (or, from read_partitions, several at once), or
+        read_slice()
+    source: DataSource
+    duration: float
+        Wall time in seconds
+    index: partition index, list of them, region (see read_slice), or None
+    nbytes: int or None
+        Size of the partition(s) returned, where known
+    hits, misses: int
+        Number of partitions found and not found in the partition cache, if
+        there is one
+    error: Exception or None
+        The exception raised by the step, if any
+    profile: pstats.Stats or None
+        The step's profile, if captured (see capture())
+    peak_memory: int or None
+        Peak bytes allocated during the step, if captured (see capture())
+    """
+    __slots__ = ('kind', 'source', 'duration', 'index', 'nbytes', 'hits',
+                 'misses', 'error', 'profile', 'peak_memory')
+
+    def __init__(self, kind, source, duration, index=None, nbytes=None,
+                 hits=0, misses=0, error=None, profile=None, peak_memory=None):
+        self.kind = kind
+        self.source = source
+        self.duration = duration
+        self.index = index
+        self.nbytes = nbytes
+        self.hits = hits
+        self.misses = misses
+        self.error = error
+        self.profile = profile
+        self.peak_memory = peak_memory
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__} {self.kind} {_label(self.source)} "
+                f"{self.duration:.6f}s>")
+
+
+def add_listener(listener):
+    "Call listener(event) after every instrumented step, in any thread."
+    _listeners.append(listener)
+
+
+def remove_listener(listener):
+    _listeners.remove(listener)
+
+
+@contextlib.contextmanager
+def capture(profile=True, memory=False):
+    """
+    Within this context, attach a cProfile profile and/or the peak of
+    tracemalloc-traced memory to each Event.
+
+    Only the outermost step in each thread is captured; steps nested in it
+    (such as a read() during schema discovery) are included in its capture.
+    Both slow reading down considerably.
+    """
+    previous = dict(_capture)
+    _capture.update(profile=profile, memory=memory)
+    try:
+        yield
+    finally:
+        _capture.update(previous)
+
+
+def record(kind, source, index=None):
+    """
+    Return a context manager that times a step and notifies the listeners.
+
+    Within it, count partition cache lookups in the ``hits`` and ``misses``
+    attributes, and pass the step's result to ``result()`` to have its size
+    recorded.
+    """
+    if not _listeners:
+        return _NULL_RECORDER
+    return _Recorder(kind, source, index)
+
+
+class _NullRecorder:
+    hits = misses = 0
+
+    def __setattr__(self, name, value):
+        pass
+
+    def result(self, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_details):
+        pass
+
+
+_NULL_RECORDER = _NullRecorder()
+
+
+class _Recorder:
+    def __init__(self, kind, source, index):
+        self.kind = kind
+        self.source = source
+        self.index = index
+        self.hits = self.misses = 0
+        self.nbytes = None
+
+    def result(self, value):
+        if isinstance(value, (list, tuple)):
+            sizes = [_nbytes(item) for item in value]
+            self.nbytes = None if None in sizes else sum(sizes)
+        else:
+            self.nbytes = _nbytes(value)
+
+    def __enter__(self):
+        depth = getattr(_local, 'depth', 0)
+        _local.depth = depth + 1
+        self._profiler = None
+        self._tracing = False
+        if depth == 0 and _capture['profile']:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Another profiler is active, perhaps in another thread.
+                self._profiler = None
+        if depth == 0 and _capture['memory']:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self._start
+        _local.depth -= 1
+        profile = peak_memory = None
+        if self._profiler is not None:
+            import pstats
+
+            self._profiler.disable()
+            profile = pstats.Stats(self._profiler)
+        if _local.depth == 0 and _capture['memory']:
+            import tracemalloc
+
+            if tracemalloc.is_tracing():
+                _, peak_memory = tracemalloc.get_traced_memory()
+                if self._tracing:
+                    tracemalloc.stop()
+        event = Event(self.kind, self.source, duration, index=self.index,
+                      nbytes=self.nbytes, hits=self.hits, misses=self.misses,
+                      error=exc_value,
+                      profile=profile, peak_memory=peak_memory)
+        for listener in list(_listeners):
+            try:
+                listener(event)
+            except Exception as err:
+                # Instrumentation must never break reading.
+                warnings.warn(f"Instrumentation listener {listener!r} "
+                              f"failed: {err!r}")
+
+
+def _nbytes(value):
+    "Size in bytes of an in-memory container, or None if not known."
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage) and not hasattr(value, 'dask'):
+        # a pandas DataFrame (but not a dask one)
+        return int(memory_usage(index=True).sum())
+    return None
+
+
+def _label(source):
+    return source.name or source.classname
+
+
+class StatsCollector:
+    """
+    A listener that keeps running totals per source and kind of step.
+
+    Sources are identified by name or, lacking one, class name.
+
+    Examples
+    --------
+    >>> collector = StatsCollector()
+    >>> add_listener(collector)
+    >>> source.read_partition(0)
+    >>> print(collector.report())
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}  # maps (label, kind) to dict of totals
+
+    def __call__(self, event):
+        key = (_label(event.source), event.kind)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    'count': 0, 'errors': 0, 'total_time': 0.0,
+                    'max_time': 0.0, 'nbytes': 0, 'hits': 0, 'misses': 0}
+            stats['count'] += 1
+            stats['errors'] += event.error is not None
+            stats['total_time'] += event.duration
+            stats['max_time'] = max(stats['max_time'], event.duration)
+            stats['nbytes'] += event.nbytes or 0
+            stats['hits'] += event.hits
+            stats['misses'] += event.misses
+
+    def summary(self):
+        "Return a dict mapping (source, kind) to a dict of totals."
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._stats.items()}
+
+    def report(self):
+        "Return the totals as a table, slowest first."
+        lines = [f"{'source':<30} {'kind':<10} {'count':>7} {'total s':>10} "
+                 f"{'max s':>10} {'MB':>10} {'hits':>6} {'misses':>6}"]
+        items = sorted(self.summary().items(),
+                       key=lambda item: item[1]['total_time'], reverse=True)
+        for (label, kind), stats in items:
+            lines.append(
+                f"{label:<30} {kind:<10} {stats['count']:>7} "
+                f"{stats['total_time']:>10.4f} {stats['max_time']:>10.4f} "
+                f"{stats['nbytes'] / 1e6:>10.2f} {stats['hits']:>6} "
+                f"{stats['misses']:>6}")
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
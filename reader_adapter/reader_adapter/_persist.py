@@ -0,0 +1,246 @@
+"""
+Fast on-disk formats for persist() and export(), and the local persist store.
+
+Arrays are written as a directory of .npy files, one per block, which keeps
+the block layout of the original source. DataFrames are written as
+partitioned Parquet.
+"""
+import importlib
+import itertools
+import json
+import os
+import shutil
+import time
+
+from ._registry import adapt
+
+
+class ChunkedNPYReader:
+    """
+    Read a directory of .npy blocks written by write_chunked_npy.
+
+    Blocks are memory-mapped, not read, when they are computed.
+    """
+    container = 'dask.array.core.Array'
+
+    def __init__(self, path):
+        self._path = path
+        self._closed = False
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._path!r})"
+
+    def read(self):
+        if self._closed:
+            raise Closed(f"{self} is closed and can no longer be read.")
+        import dask.array
+        import numpy
+        from dask.base import tokenize
+
+        with open(os.path.join(self._path, _LAYOUT_FILENAME)) as file:
+            layout = json.load(file)
+        chunks = tuple(tuple(c) for c in layout['chunks'])
+        name = 'chunked-npy-' + tokenize(self._path, layout)
+        dsk = {}
+        for index in itertools.product(*(range(len(c)) for c in chunks)):
+            filepath = os.path.join(self._path, _block_filename(index))
+            dsk[(name,) + index] = (_load_block, filepath)
+        return dask.array.Array(dsk, name, chunks,
+                                dtype=numpy.dtype(layout['dtype']))
+
+    def close(self):
+        self._closed = True
+        # Nothing to clean up.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_details):
+        self.close()
+
+
+class ParquetReader:
+    """
+    Read a directory of Parquet files, such as one written by dask.
+
+    Only the given columns are read, and row groups that cannot pass the
+    filters are skipped; see dask.dataframe.read_parquet.
+    """
+    container = 'dask.dataframe.core.DataFrame'
+    pushdown = ('columns', 'filters')
+
+    def __init__(self, path, columns=None, filters=None):
+        self._path = path
+        self._columns = columns
+        self._filters = filters
+        self._closed = False
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._path!r})"
+
+    def read(self):
+        if self._closed:
+            raise Closed(f"{self} is closed and can no longer be read.")
+        import dask.dataframe
+
+        return dask.dataframe.read_parquet(self._path, columns=self._columns,
+                                           filters=self._filters)
+
+    def close(self):
+        self._closed = True
+        # Nothing to clean up.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_details):
+        self.close()
+
+
+class Closed(Exception):
+    ...
+
+
+_LAYOUT_FILENAME = 'layout.json'
+
+
+def _block_filename(index):
+    return '-'.join(map(str, index)) + '.npy'
+
+
+def _load_block(filepath):
+    import numpy
+
+    return numpy.load(filepath, mmap_mode='r')
+
+
+def _save_block(filepath, block):
+    import numpy
+
+    numpy.save(filepath, block, allow_pickle=False)
+
+
+def write_chunked_npy(array, path):
+    """
+    Write a dask array as one .npy file per block, plus a layout file.
+
+    The layout file is written last, so an interrupted write is not mistaken
+    for a complete one.
+    """
+    import dask
+
+    os.makedirs(path, exist_ok=True)
+    layout_path = os.path.join(path, _LAYOUT_FILENAME)
+    if os.path.exists(layout_path):
+        os.remove(layout_path)
+    indices = itertools.product(*(range(n) for n in array.numblocks))
+    writes = [dask.delayed(_save_block)(os.path.join(path, _block_filename(index)),
+                                        block)
+              for index, block in zip(indices, array.to_delayed().ravel())]
+    dask.compute(*writes)
+    layout = {'dtype': array.dtype.str, 'chunks': array.chunks}
+    with open(layout_path, 'w') as file:
+        json.dump(layout, file)
+
+
+def write_parquet(dataframe, path, **kwargs):
+    """
+    Write a dask DataFrame as partitioned Parquet, replacing anything at path.
+    """
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    dataframe.to_parquet(path, **kwargs)
+
+
+class PersistStore:
+    """
+    A local directory of persisted sources, keyed by original source token.
+
+    Each entry is a directory holding the data and a JSON record of how to
+    reconstruct the source that reads it.
+
+    Parameters
+    ----------
+    directory: str, optional
+        Defaults to $READER_ADAPTER_PERSIST_DIR, or else
+        ~/.cache/reader_adapter/persisted
+    """
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.environ.get(
+                'READER_ADAPTER_PERSIST_DIR',
+                os.path.join(os.path.expanduser('~'), '.cache',
+                             'reader_adapter', 'persisted'))
+        self.directory = directory
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.directory!r})"
+
+    def getdir(self, source):
+        "Where to write the persisted data for this source."
+        return os.path.join(self.directory, source._tok)
+
+    def _record_path(self, tok):
+        return os.path.join(self.directory, f"{tok}.json")
+
+    def add(self, tok, source):
+        "Record a persisted source as the stand-in for the source with tok."
+        os.makedirs(self.directory, exist_ok=True)
+        record = {'cls': source.classname,
+                  'args': source._captured_init_args,
+                  'kwargs': source._captured_init_kwargs,
+                  'name': source.name,
+                  'description': source.description,
+                  'metadata': source.metadata}
+        tmp_path = f"{self._record_path(tok)}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            # Original source arguments that are not JSON-serializable are
+            # only kept for reference, so their repr will do.
+            json.dump(record, file, default=repr)
+        os.replace(tmp_path, self._record_path(tok))
+
+    def record(self, tok):
+        try:
+            with open(self._record_path(tok)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise KeyError(tok)
+
+    def __contains__(self, tok):
+        return os.path.exists(self._record_path(tok))
+
+    def __getitem__(self, tok):
+        "Reconstruct the persisted source."
+        record = self.record(tok)
+        module_name, _, class_name = record['cls'].rpartition('.')
+        cls = getattr(importlib.import_module(module_name), class_name)
+        source = cls(*record['args'], **record['kwargs'])
+        source.name = record['name']
+        source.description = record['description']
+        source.metadata = record['metadata']
+        return source
+
+    def needs_refresh(self, tok):
+        "True if this entry has outlived its time to live."
+        try:
+            metadata = self.record(tok)['metadata']
+        except KeyError:
+            return False
+        ttl = metadata.get('ttl')
+        return ttl is not None and time.time() - metadata['timestamp'] > ttl
+
+    def remove(self, tok):
+        try:
+            os.remove(self._record_path(tok))
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(os.path.join(self.directory, tok), ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+store = PersistStore()
+
+NPYDataSource = adapt(ChunkedNPYReader, 'NPYDataSource')
+ParquetDataSource = adapt(ParquetReader, 'ParquetDataSource')
@@ -0,0 +1,97 @@
+"""
+Helpers for streaming partitions out of a source with bounded read-ahead.
+"""
+import collections
+import concurrent.futures
+import itertools
+import os
+
+
+def iter_block_indices(numblocks, order='C'):
+    """
+    Yield every N-d block index in a block grid.
+
+    Parameters
+    ----------
+    numblocks: tuple
+        Number of blocks along each axis, as in dask.array.Array.numblocks
+    order: {'C', 'F'}
+        'C' varies the last axis fastest; 'F' varies the first axis fastest.
+    """
+    if order not in ('C', 'F'):
+        raise ValueError(f"order must be 'C' or 'F', not {order!r}")
+    ranges = [range(n) for n in numblocks]
+    if order == 'C':
+        yield from itertools.product(*ranges)
+    else:
+        for index in itertools.product(*reversed(ranges)):
+            yield tuple(reversed(index))
+
+
+def prefetch_map(func, items, max_workers=None, prefetch=None, executor='thread'):
+    """
+    Like map(func, items), but keep up to ``prefetch`` calls in flight.
+
+    Results are yielded in the order of ``items``. New work is only submitted
+    as results are consumed, so a slow consumer holds back the producers.
+
+    Parameters
+    ----------
+    func: callable
+    items: iterable
+        Consumed lazily.
+    max_workers: int, optional
+        Size of the pool. Defaults to the number of CPUs. Ignored if
+        ``executor`` is an Executor instance.
+    prefetch: int, optional
+        Maximum number of calls in flight. Defaults to twice ``max_workers``.
+    executor: {'thread', 'process'} or concurrent.futures.Executor
+        With 'process', ``func`` and ``items`` must be picklable.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if prefetch is None:
+        prefetch = 2 * max_workers
+    if prefetch < 1:
+        raise ValueError("prefetch must be at least 1")
+    if executor == 'thread':
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers)
+        owned = True
+    elif executor == 'process':
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers)
+        owned = True
+    elif isinstance(executor, concurrent.futures.Executor):
+        pool = executor
+        owned = False
+    else:
+        raise ValueError(
+            f"executor must be 'thread', 'process', or an Executor, not {executor!r}")
+    items = iter(items)
+    in_flight = collections.deque()
+    try:
+        for item in itertools.islice(items, prefetch):
+            in_flight.append(pool.submit(func, item))
+        while in_flight:
+            result = in_flight.popleft().result()
+            # Top up the window before handing the result over so that the
+            # pool keeps working while the consumer processes it.
+            for item in itertools.islice(items, 1):
+                in_flight.append(pool.submit(func, item))
+            yield result
+    finally:
+        # Runs on exhaustion, on error, and when the consumer abandons the
+        # generator early.
+        for future in in_flight:
+            future.cancel()
+        if owned:
+            pool.shutdown(wait=False)
+
+
+def compute_synchronous(collection):
+    """
+    Compute a dask collection in the calling thread.
+
+    The pool in prefetch_map provides the parallelism, so do not let each
+    task start up a scheduler with a pool of its own.
+    """
+    return collection.compute(scheduler='synchronous')
@@ -1,4 +1,10 @@
-from ._adapters import DaskArrayAdapter, DaskDataFrameAdapter
+import heapq
+import itertools
+
+from ._adapters import (DaskArrayAdapter, DaskDataFrameAdapter, NumpyArrayAdapter,
+                        PandasDataFrameAdapter, XArrayDataArrayAdapter,
+                        XArrayDatasetAdapter)
+from ._convert import BUILTIN_CONVERTERS
 
 
 def register(container, adapter):
@@ -16,26 +22,113 @@ def register(container, adapter):
     register._registry[container] = adapter
 
 
-def adapt(reader_class, class_name):
+def register_converter(source, target, converter, cost=1):
+    """
+    Register a conversion from one container to another.
+
+    adapt() chains conversions to fit a Reader whose container has no adapter
+    of its own (or that is asked for a different one) to an adapter.
+
+    Parameters
+    ----------
+    source, target: string
+        Fully-qualified class names
+    converter: callable
+        Takes a source container and returns a target container
+    cost: number
+        Estimated relative cost, which adapt() minimizes over the chain. By
+        convention, 1 to wrap without copying, 2 to copy in memory, and 10 to
+        compute a lazy container.
+    """
+    register_converter._converters.setdefault(source, {})[target] = (converter, cost)
+
+
+def _conversion_path(source, targets):
+    """
+    Return the converters of the cheapest chain from source to any of the
+    targets, and the target reached, or raise KeyError.
+    """
+    converters = register_converter._converters
+    # Dijkstra's algorithm; ties are broken by the length of the chain, then
+    # by name, then by the order found, so that the choice is stable and the
+    # converters themselves are never compared.
+    counter = itertools.count()
+    queue = [(0, 0, source, next(counter), ())]
+    done = set()
+    while queue:
+        cost, length, container, _, path = heapq.heappop(queue)
+        if container in done:
+            continue
+        if container in targets:
+            return list(path), container
+        done.add(container)
+        for target, (converter, step) in sorted(converters.get(container, {}).items()):
+            if target not in done:
+                heapq.heappush(queue, (cost + step, length + 1, target,
+                                       next(counter), path + (converter,)))
+    raise KeyError(source)
+
+
+def adapt(reader_class, class_name, container=None):
+    """
+    Build a DataSource class around a Reader class.
+
+    Parameters
+    ----------
+    reader_class: type
+        Implements read(), close(), and a ``container`` attribute
+    class_name: str
+        Name of the new class
+    container: str, optional
+        Fully-qualified class name of the container the DataSource should
+        present, if not the Reader's own. By default, the Reader's container
+        is used if an adapter is registered for it. Otherwise, or if another
+        container is named here, the Reader's reading is converted along the
+        cheapest chain of registered converters (see register_converter).
+    """
     # First check that reader_class implements all the expected API.
     try:
         reader_class.read
         reader_class.close
-        container = reader_class.container
+        reader_container = reader_class.container
     except AttributeError as err:
         raise ValueError(
             "reader_class must implement read, close, and container") from err
+    if container is None:
+        targets = set(register._registry)
+    else:
+        targets = {container} & set(register._registry)
     try:
-        base = register._registry[reader_class.container]
+        conversions, target = _conversion_path(reader_container, targets)
     except KeyError as err:
         raise KeyError(
-            f"No adapter is registered for the container type {container}") from err
-    return type(class_name, (base,), {'_reader_class': reader_class})
+            f"No adapter is registered for the container type "
+            f"{container or reader_container}, and none can be reached by "
+            f"conversion from {reader_container}") from err
+    base = register._registry[target]
+    namespace = {'_reader_class': reader_class,
+                 # Place the class in the Reader's module so that it can be
+                 # found again by its classname, as intake does with the
+                 # 'driver' of a persisted source.
+                 '__module__': reader_class.__module__}
+    if conversions:
+        namespace['_reader_container'] = reader_container
+        namespace['_conversions'] = tuple(conversions)
+    return type(class_name, (base,), namespace)
 
 
 register._registry = {}  # maps container (string) to adapter_class
+register_converter._converters = {}  # maps source to {target: (converter, cost)}
 
 
 # Register built-in adapters.
 register('dask.array.core.Array', DaskArrayAdapter)
 register('dask.dataframe.core.DataFrame', DaskDataFrameAdapter)
+register('numpy.ndarray', NumpyArrayAdapter)
+register('pandas.core.frame.DataFrame', PandasDataFrameAdapter)
+register('xarray.core.dataarray.DataArray', XArrayDataArrayAdapter)
+register('xarray.core.dataset.Dataset', XArrayDatasetAdapter)
+
+# Register built-in conversions between containers.
+for _source, _target, _converter, _cost in BUILTIN_CONVERTERS:
+    register_converter(_source, _target, _converter, _cost)
@@ -0,0 +1,143 @@
+"""
+A process-wide registry of Readers, so that sources constructed with the same
+arguments share one Reader and one result of Reader.read().
+"""
+import collections
+import threading
+
+
+class ReaderRegistry:
+    """
+    Share Readers among sources, keyed by a token of the Reader class and its
+    arguments.
+
+    A Reader is constructed, and its read() called, at most once per key,
+    even when several threads ask at the same time. Entries are kept in
+    least-recently-used order; beyond ``maxsize`` of them, the least recently
+    used entries that no source is using are dropped and their Readers
+    closed. A Reader still in use when it is dropped is closed when the last
+    source using it is closed or garbage-collected.
+
+    Tokens include the size and modification time of files named by path in
+    the arguments (see _tokenize), so a source constructed after its file
+    changes gets a new Reader. Use invalidate() for changes that tokens cannot
+    see, such as files added to a glob or named without a directory.
+
+    Parameters
+    ----------
+    maxsize: int, optional
+        Maximum number of entries. 128 by default.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()  # maps key to _Entry
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {len(self)}/{self.maxsize} entries>"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def acquire(self, key, factory):
+        """
+        Return the entry for key, calling factory() to make its Reader if
+        there is none yet. Pass the entry to release() when done with it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(key)
+            self._entries.move_to_end(key)
+            entry.users += 1
+        try:
+            with entry.lock:
+                if entry.reader is None:
+                    entry.reader = factory()
+        except BaseException:
+            # Drop the entry so that the next caller tries again.
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                entry.users -= 1
+            raise
+        self._evict()
+        return entry
+
+    def release(self, entry):
+        "Stop using an entry, closing its Reader if it is no longer needed."
+        with self._lock:
+            entry.users -= 1
+            close = (entry.users == 0 and
+                     self._entries.get(entry.key) is not entry)
+        if close:
+            entry.close()
+
+    def invalidate(self, key=None):
+        """
+        Drop the entry for key, or every entry if key is None.
+
+        Readers not in use are closed now, and the others when released.
+        """
+        with self._lock:
+            if key is None:
+                dropped = list(self._entries.values())
+                self._entries.clear()
+            else:
+                dropped = [self._entries.pop(key)] if key in self._entries else []
+            unused = [entry for entry in dropped if entry.users == 0]
+        for entry in unused:
+            entry.close()
+
+    def _evict(self):
+        with self._lock:
+            excess = len(self._entries) - self.maxsize
+            unused = []
+            for key, entry in list(self._entries.items()):
+                if excess <= 0:
+                    break
+                if entry.users == 0:
+                    unused.append(self._entries.pop(key))
+                    excess -= 1
+        for entry in unused:
+            entry.close()
+
+
+class _Entry:
+    def __init__(self, key):
+        self.key = key
+        self.lock = threading.Lock()
+        self.reader = None
+        self.reading = None  # will cache self.reader.read()
+        self.users = 0
+
+    def read(self):
+        "Call read() on the Reader once, and return its result every time."
+        with self.lock:
+            if self.reading is None:
+                self.reading = self.reader.read()
+            return self.reading
+
+    async def aread(self, aread):
+        """
+        Like read(), but await the Reader's aread() coroutine function.
+
+        Sources awaiting at the same time may each call it, but all of them
+        get the result that is cached first.
+        """
+        if self.reading is None:
+            reading = await aread()
+            with self.lock:
+                if self.reading is None:
+                    self.reading = reading
+        return self.reading
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+
+
+readers = ReaderRegistry()
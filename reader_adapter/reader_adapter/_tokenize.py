@@ -0,0 +1,150 @@
+"""
+Deterministic tokens for DataSource identity, without dask.
+"""
+import hashlib
+import os
+import stat
+
+
+def tokenize(*args):
+    """
+    Return a hex token that is the same for equal arguments, across processes.
+
+    Strings, bytes, numbers, None, and lists, tuples, and dicts of them are
+    hashed (with blake2b) from a canonical encoding: tuples and lists are
+    interchangeable, as they are after a round trip through msgpack, and the
+    order of dict items does not matter. A string that looks like a path
+    (absolute, or with a directory separator) and names an existing file also
+    contributes the file's size and modification time, so the token changes
+    when the file does; other strings, such as column names, are not looked
+    up, which saves a system call each. Objects with a __dask_tokenize__ method are
+    represented by what it returns. Anything else is tokenized by dask.
+    """
+    parts = []
+    _encode(args, parts.append)
+    return hashlib.blake2b(b''.join(parts), digest_size=16).hexdigest()
+
+
+# Every value is written as a one-byte type tag, then its contents, with
+# lengths where needed so that no two values share an encoding.
+
+def _encode(obj, write):
+    encoder = _ENCODERS.get(type(obj))
+    if encoder is None:
+        encoder = _encoder_for_subclass(obj)
+    encoder(obj, write)
+
+
+def _encode_none(obj, write):
+    write(b'N')
+
+
+def _encode_bool(obj, write):
+    write(b'T' if obj else b'F')
+
+
+def _encode_int(obj, write):
+    write(b'i%d;' % obj)
+
+
+def _encode_float(obj, write):
+    write(b'f' + float.hex(obj).encode() + b';')
+
+
+def _encode_str(obj, write):
+    data = obj.encode('utf-8', 'surrogatepass')
+    write(b's%d;' % len(data))
+    write(data)
+    stat = _stat(obj)
+    if stat is not None:
+        write(b'%d;%d;' % stat)
+
+
+def _encode_bytes(obj, write):
+    write(b'b%d;' % len(obj))
+    write(obj)
+
+
+def _encode_sequence(obj, write):
+    write(b'l%d;' % len(obj))
+    for item in obj:
+        _encode(item, write)
+
+
+def _encode_dict(obj, write):
+    # Sort by the encoding of each key, which works for keys of any type.
+    # Keys are names, not paths, so they are not looked up as files.
+    items = []
+    for key, value in obj.items():
+        if type(key) is str:
+            data = key.encode('utf-8', 'surrogatepass')
+            key = b'k%d;' % len(data) + data
+        else:
+            parts = []
+            _encode(key, parts.append)
+            key = b''.join(parts)
+        items.append((key, value))
+    items.sort(key=lambda item: item[0])
+    write(b'd%d;' % len(items))
+    for key, value in items:
+        write(key)
+        _encode(value, write)
+
+
+def _encode_tokenizable(obj, write):
+    write(b'o')
+    _encode(obj.__dask_tokenize__(), write)
+
+
+def _encode_other(obj, write):
+    from dask.base import tokenize
+
+    write(b'x' + tokenize(obj).encode() + b';')
+
+
+_ENCODERS = {
+    type(None): _encode_none,
+    bool: _encode_bool,
+    int: _encode_int,
+    float: _encode_float,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    list: _encode_sequence,
+    tuple: _encode_sequence,
+    dict: _encode_dict,
+}
+
+
+def _encoder_for_subclass(obj):
+    # Subclasses of the types above, such as OrderedDict, are encoded like
+    # their base type, unless they say how to tokenize them.
+    if hasattr(type(obj), '__dask_tokenize__'):
+        return _encode_tokenizable
+    for cls in (dict, list, tuple):
+        if isinstance(obj, cls):
+            return _ENCODERS[cls]
+    return _encode_other
+
+
+def _stat(path):
+    """
+    (size, mtime in ns) of the file at path, or None if there is none or if
+    path does not look like a path.
+    """
+    if not path or '\0' in path or not _looks_like_path(path):
+        return None
+    try:
+        result = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if not stat.S_ISREG(result.st_mode):
+        return None
+    return result.st_size, result.st_mtime_ns
+
+
+def _looks_like_path(string):
+    "Is string absolute, or does it have a directory separator?"
+    return os.path.isabs(string) or any(sep in string for sep in _SEPARATORS)
+
+
+_SEPARATORS = [sep for sep in (os.sep, os.altsep) if sep]
@@ -0,0 +1,74 @@
+"""
+Serialization of partitions into buffers that can be sent without copying.
+
+read_partition_buffer(i) returns (header, frames): header is a small dict of
+plain values (safe for msgpack or JSON), and frames is a list of bytes-like
+objects to send as they are. from_partition_buffer(header, frames) turns
+them back into the partition on the other side.
+"""
+import pickle
+import sys
+
+
+def to_buffers(partition):
+    """
+    Return (header, frames) for a partition.
+
+    Arrays are pickled with protocol 5, which leaves their data out-of-band:
+    the frames are the (small) pickle followed by views of the array's own
+    memory. The header also describes the array, for consumers that would
+    rather not unpickle. DataFrames become one frame of Arrow IPC stream.
+    Anything else is pickled with protocol 5.
+    """
+    numpy = sys.modules.get('numpy')
+    pandas = sys.modules.get('pandas')
+    if numpy is not None and isinstance(partition, numpy.ndarray):
+        # Drop subclasses such as numpy.memmap, without copying.
+        array = numpy.asarray(partition)
+        if not (array.flags.c_contiguous or array.flags.f_contiguous):
+            # pickle would copy such an array in-band anyway.
+            array = numpy.ascontiguousarray(array)
+        header = {'format': 'pickle5',
+                  'type': 'numpy.ndarray',
+                  'dtype': array.dtype.str,
+                  'shape': list(array.shape),
+                  'strides': list(array.strides)}
+        return header, _pickle(array)
+    if pandas is not None and isinstance(partition, pandas.DataFrame):
+        import pyarrow
+
+        table = pyarrow.Table.from_pandas(partition)
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        header = {'format': 'arrow-ipc',
+                  'type': 'pandas.core.frame.DataFrame',
+                  'columns': [str(name) for name in partition.columns],
+                  'nrows': len(partition)}
+        return header, [memoryview(sink.getvalue())]
+    header = {'format': 'pickle5',
+              'type': f"{type(partition).__module__}.{type(partition).__name__}"}
+    return header, _pickle(partition)
+
+
+def from_partition_buffer(header, frames):
+    """
+    Rebuild a partition from the (header, frames) of read_partition_buffer.
+
+    Arrays are rebuilt around the frames' memory, without copying.
+    """
+    if header['format'] == 'pickle5':
+        return pickle.loads(frames[0], buffers=frames[1:])
+    if header['format'] == 'arrow-ipc':
+        import pyarrow
+
+        with pyarrow.ipc.open_stream(pyarrow.py_buffer(frames[0])) as reader:
+            return reader.read_all().to_pandas()
+    raise ValueError(f"Unknown partition buffer format {header['format']!r}")
+
+
+def _pickle(obj):
+    "Pickle obj with protocol 5; return the pickle and its out-of-band buffers."
+    buffers = []
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    return [data] + [buffer.raw() for buffer in buffers]
@@ -47,13 +47,25 @@ class DictSerialiseMixin:
     "Vendored from intake.utils. (Original has no class docstring.)"
     def __new__(cls, *args, **kwargs):
         """Capture creation args when instantiating"""
-        from dask.base import tokenize
         o = object.__new__(cls)
         o._captured_init_args = args
         o._captured_init_kwargs = kwargs
-        o.__dict__['_tok'] = tokenize(o.__getstate__())
         return o
 
+    @property
+    def _tok(self):
+        # Not vendored: intake tokenizes __getstate__() with dask eagerly in
+        # __new__, but that imports dask and costs time for every source
+        # constructed, so do it on first use instead, with our own tokenize.
+        # (Nested sources contribute their own cached tokens.)
+        tok = self.__dict__.get('_tok')
+        if tok is None:
+            from ._tokenize import tokenize
+            tok = self.__dict__['_tok'] = tokenize(self.classname,
+                                                   self._captured_init_args,
+                                                   self._captured_init_kwargs)
+        return tok
+
     @property
     def classname(self):
         return classname(self)
@@ -1,3 +1,5 @@
+import numpy
+
 import my_tiff_package
 
 
@@ -6,8 +8,8 @@ reader = my_tiff_package.TIFFReader('example_data/coffee.tif')
 reader.read()
 reader.close()
 
-# The wrapped-in-DataSource version implements most of the API (except cache
-# and persist).
+# The wrapped-in-DataSource version implements most of the API (except
+# intake's cache).
 data_source = my_tiff_package.TIFFDataSource('example_data/coffee.tif')
 data_source.discover()
 data_source.read()
@@ -16,6 +18,16 @@ data_source.read_partition(0)
 data_source.to_dask()
 data_source.close()
 
+# Partitions read on several threads share open files; check that they do
+# not interfere, on a compressed, tiled stack (one page per partition).
+reader = my_tiff_package.TIFFReader('example_data/lfw_subset_tiled_zlib.tif')
+stack = numpy.asarray(reader.read())
+reader.close()
+for _ in range(10):
+    with my_tiff_package.TIFFDataSource('example_data/lfw_subset_tiled_zlib.tif') as data_source:
+        chunks = list(data_source.read_chunked(max_workers=4))
+    assert numpy.array_equal(numpy.concatenate(chunks), stack)
+
 # It works in a catalog.
 import intake
 catalog = intake.open_catalog('catalog.yml')